@@ -1,15 +1,23 @@
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import Response
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import base64
-import json
+import math
 import sys
 import os
+import time
+import uuid
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.handlers import upload_image, list_images, view_image, delete_image
+from src.utils.serializer import dumps, loads
+from src.utils.rate_limiter import AdmissionController
+from src.utils.image_service import ImageService, is_throttling_error
+from src.utils.response import RETRY_AFTER_SECONDS
+from src.utils.tracing import request_context
+from src.utils import metrics
 
 app = FastAPI(
     title="Instagram-like Image Service API",
@@ -19,13 +27,81 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Give every request an ID (X-Request-Id, generated if absent) and record its latency"""
+    request_id = request.headers.get('x-request-id') or str(uuid.uuid4())
+    with request_context(request_id, request.url.path) as trace:
+        response = await call_next(request)
+    endpoint = request.scope.get('endpoint')
+    route = endpoint.__name__ if endpoint else 'unmatched'
+    duration = time.perf_counter() - trace.started_at
+    metrics.observe('http_request_duration_seconds', duration, route=route, method=request.method)
+    metrics.increment('http_requests_total', route=route, method=request.method, status=str(response.status_code))
+    response.headers['X-Request-Id'] = request_id
+    return response
+
+# Image storage backend: 's3' (default) or 'local' (see LOCAL_STORAGE_ROOT)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 's3')
+
+# Per-user token buckets; RATE_LIMIT_PER_SECOND=0 disables admission control
+admission = AdmissionController(
+    rate=float(os.environ.get('RATE_LIMIT_PER_SECOND', '10')),
+    burst=float(os.environ.get('RATE_LIMIT_BURST', '20'))
+)
+
+def admit(key: str) -> None:
+    """Shed load with 429 before it reaches DynamoDB when key is over its rate"""
+    wait = admission.admit(key)
+    if wait > 0:
+        raise HTTPException(status_code=429, detail='Too many requests, please retry later',
+                            headers={'Retry-After': str(math.ceil(wait))})
+
+def client_key(http_request: Request) -> str:
+    """Key requests by the caller: the X-User-Id header, falling back to the client address.
+
+    The header is not authenticated, so this spreads honest clients over separate
+    buckets but does not stop a client from claiming another caller's key.
+    """
+    user_id = http_request.headers.get('x-user-id')
+    if user_id:
+        return f"user:{user_id}"
+    return f"ip:{http_request.client.host if http_request.client else 'unknown'}"
+
+def serve_local_image(image_id: str) -> FileResponse:
+    """Serve an image straight from the local storage backend.
+
+    Skips the handler's read-everything-and-base64 round trip; the file is streamed
+    from disk in chunks instead of being loaded into memory. Raises a 404 when the
+    metadata or the file does not exist, so a miss costs one metadata read.
+    """
+    service = ImageService()
+    try:
+        metadata = service.get_image_metadata(image_id)
+    except Exception as e:
+        if is_throttling_error(e):
+            raise HTTPException(status_code=429, detail='Too many requests, please retry later',
+                                headers={'Retry-After': str(RETRY_AFTER_SECONDS)})
+        raise
+    path = metadata and service.storage.local_path(metadata['s3_key'])
+    if not path:
+        raise HTTPException(status_code=404, detail='Image not found')
+    return FileResponse(path, media_type=metadata['content_type'],
+                        headers={'Content-Disposition': f'inline; filename="{image_id}"'})
+
+def handler_error(result: Dict[str, Any]) -> HTTPException:
+    """Convert a non-success Lambda handler result into an HTTPException"""
+    body = loads(result['body'])
+    headers = {'Retry-After': result['headers']['Retry-After']} if 'Retry-After' in result['headers'] else None
+    return HTTPException(status_code=result['statusCode'], detail=body.get('error'), headers=headers)
+
 # Pydantic models for request/response validation
 class ImageMetadata(BaseModel):
     user_id: str
     title: Optional[str] = ""
     description: Optional[str] = ""
     tags: Optional[List[str]] = []
-    content_type: Optional[str] = "image/jpeg"
+    content_type: Optional[str] = None  # detected from the image bytes when omitted
 
 class UploadImageRequest(BaseModel):
     image: str  # base64 encoded
@@ -43,6 +119,9 @@ class ImageInfo(BaseModel):
     tags: List[str]
     content_type: str
     created_at: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    size_bytes: Optional[int] = None
 
 class ListImagesResponse(BaseModel):
     images: List[ImageInfo]
@@ -54,22 +133,31 @@ class DeleteImageResponse(BaseModel):
 class ErrorResponse(BaseModel):
     error: str
 
+# The image endpoints are plain functions so FastAPI runs them in its thread pool:
+# the handlers block on S3/DynamoDB, and botocore's adaptive retry mode may sleep
+# the calling thread, which must not be the event loop
+
 @app.post("/images", 
           response_model=UploadImageResponse,
-          responses={500: {"model": ErrorResponse}},
+          responses={400: {"model": ErrorResponse}, 429: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
           summary="Upload Image",
           description="Upload an image with metadata to S3 and save metadata to DynamoDB")
-async def upload_image_endpoint(request: UploadImageRequest):
+def upload_image_endpoint(request: UploadImageRequest, http_request: Request):
     """
     Upload an image with metadata.
     
     - **image**: Base64 encoded image data (supports data URL format: data:image/type;base64,xxxxx)
     - **metadata**: Image metadata including user_id, title, description, tags, and content_type
     
+    The image type (JPEG, PNG, GIF or WebP) and dimensions are read from the image
+    header; a content_type that does not match the detected type is rejected with 400.
+    
     Returns the generated image_id and success message.
     """
+    admit(client_key(http_request))
+    
     event = {
-        'body': json.dumps({
+        'body': dumps({
             'image': request.image,
             'metadata': request.metadata.dict()
         })
@@ -78,18 +166,18 @@ async def upload_image_endpoint(request: UploadImageRequest):
     result = upload_image.lambda_handler(event, {})
     
     if result['statusCode'] == 201:
-        body = json.loads(result['body'])
+        body = loads(result['body'])
         return UploadImageResponse(**body)
     else:
-        body = json.loads(result['body'])
-        raise HTTPException(status_code=result['statusCode'], detail=body.get('error'))
+        raise handler_error(result)
 
 @app.get("/images",
          response_model=ListImagesResponse,
-         responses={500: {"model": ErrorResponse}},
+         responses={429: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
          summary="List Images",
          description="List all images with optional filtering by user_id or tag")
-async def list_images_endpoint(
+def list_images_endpoint(
+    http_request: Request,
     user_id: Optional[str] = Query(None, description="Filter by user ID"),
     tag: Optional[str] = Query(None, description="Filter by tag")
 ):
@@ -101,6 +189,8 @@ async def list_images_endpoint(
     
     Returns list of images and total count.
     """
+    admit(client_key(http_request))
+    
     query_params = {}
     if user_id:
         query_params['user_id'] = user_id
@@ -114,21 +204,22 @@ async def list_images_endpoint(
     result = list_images.lambda_handler(event, {})
     
     if result['statusCode'] == 200:
-        body = json.loads(result['body'])
-        return ListImagesResponse(**body)
+        # The handler has already serialised the whole page in one pass;
+        # pass it through instead of re-validating and re-encoding every item
+        return Response(content=result['body'], media_type='application/json')
     else:
-        body = json.loads(result['body'])
-        raise HTTPException(status_code=result['statusCode'], detail=body.get('error'))
+        raise handler_error(result)
 
 @app.get("/images/{image_id}",
          responses={
-             200: {"content": {"image/jpeg": {}, "image/png": {}, "image/gif": {}}},
+             200: {"content": {"image/jpeg": {}, "image/png": {}, "image/gif": {}, "image/webp": {}}},
              404: {"model": ErrorResponse},
+             429: {"model": ErrorResponse},
              500: {"model": ErrorResponse}
          },
          summary="View/Download Image",
          description="Retrieve and download a specific image by ID")
-async def view_image_endpoint(image_id: str):
+def view_image_endpoint(image_id: str, http_request: Request):
     """
     View/download a specific image.
     
@@ -136,6 +227,11 @@ async def view_image_endpoint(image_id: str):
     
     Returns the image binary data with appropriate content-type headers.
     """
+    admit(client_key(http_request))
+    
+    if STORAGE_BACKEND == 'local':
+        return serve_local_image(image_id)
+    
     event = {
         'pathParameters': {'image_id': image_id}
     }
@@ -147,18 +243,18 @@ async def view_image_endpoint(image_id: str):
         content_type = result['headers']['Content-Type']
         return Response(content=image_data, media_type=content_type)
     else:
-        body = json.loads(result['body'])
-        raise HTTPException(status_code=result['statusCode'], detail=body.get('error'))
+        raise handler_error(result)
 
 @app.delete("/images/{image_id}",
             response_model=DeleteImageResponse,
             responses={
                 404: {"model": ErrorResponse},
+                429: {"model": ErrorResponse},
                 500: {"model": ErrorResponse}
             },
             summary="Delete Image",
             description="Delete an image and its metadata")
-async def delete_image_endpoint(image_id: str):
+def delete_image_endpoint(image_id: str, http_request: Request):
     """
     Delete an image and its metadata.
     
@@ -166,6 +262,8 @@ async def delete_image_endpoint(image_id: str):
     
     Returns success message.
     """
+    admit(client_key(http_request))
+    
     event = {
         'pathParameters': {'image_id': image_id}
     }
@@ -173,11 +271,18 @@ async def delete_image_endpoint(image_id: str):
     result = delete_image.lambda_handler(event, {})
     
     if result['statusCode'] == 200:
-        body = json.loads(result['body'])
+        body = loads(result['body'])
         return DeleteImageResponse(**body)
     else:
-        body = json.loads(result['body'])
-        raise HTTPException(status_code=result['statusCode'], detail=body.get('error'))
+        raise handler_error(result)
+
+@app.get("/metrics",
+         response_class=PlainTextResponse,
+         summary="Metrics",
+         description="Request, span and AWS call latency histograms and counters in Prometheus text format")
+async def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type='text/plain; version=0.0.4')
 
 @app.get("/health",
          summary="Health Check",
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import json
+import subprocess
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.logger import get_logger
+from infrastructure.sample_data import SAMPLE_PNG
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter, like a new Lambda container
+COLD_START_SCRIPT = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+boto3_at_import = 'boto3' in sys.modules
+result = module.lambda_handler(json.loads(sys.argv[2]), None)
+first = time.perf_counter()
+module.lambda_handler(json.loads(sys.argv[3]), None)
+warm = time.perf_counter()
+print(json.dumps({
+    'status': result['statusCode'],
+    'import_ms': (imported - start) * 1000,
+    'init_ms': (first - start) * 1000,
+    'warm_ms': (warm - first) * 1000,
+    'boto3_at_import': boto3_at_import,
+    'modules': len(sys.modules),
+}))
+'''
+
+def _upload_event() -> dict:
+    return {
+        'httpMethod': 'POST',
+        'path': '/images',
+        'body': json.dumps({'image': SAMPLE_PNG, 'metadata': {'user_id': 'benchmark_user'}})
+    }
+
+def _seed_image() -> str:
+    from src.handlers import upload_image
+    result = upload_image.lambda_handler(_upload_event(), None)
+    return json.loads(result['body'])['image_id']
+
+def _measure(module: str, event: dict, warm_event: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', COLD_START_SCRIPT, module, json.dumps(event), json.dumps(warm_event)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def benchmark_cold_start(runs: int = 3) -> None:
+    """Report import time and init duration per route, per-function vs router"""
+    view_id = _seed_image()
+    routes = [
+        ('upload', 'upload_image', lambda: _upload_event()),
+        ('list', 'list_images', lambda: {'httpMethod': 'GET', 'path': '/images', 'queryStringParameters': None}),
+        ('list by user', 'list_images', lambda: {
+            'httpMethod': 'GET', 'path': '/images', 'queryStringParameters': {'user_id': 'benchmark_user'}
+        }),
+        ('view', 'view_image', lambda: {
+            'httpMethod': 'GET', 'path': f'/images/{view_id}', 'pathParameters': {'image_id': view_id}
+        }),
+        ('delete', 'delete_image', lambda: (lambda image_id: {
+            'httpMethod': 'DELETE', 'path': f'/images/{image_id}', 'pathParameters': {'image_id': image_id}
+        })(_seed_image())),
+        ('unknown route', None, lambda: {'httpMethod': 'GET', 'path': '/unknown'}),
+    ]
+
+    logger.info(f"{'route':<14} {'entry':<10} {'status':>6} {'import ms':>10} {'init ms':>9} "
+                f"{'warm ms':>8} {'modules':>8} boto3@import")
+    for name, handler_module, make_event in routes:
+        entries = [('router', 'src.handlers.router')]
+        if handler_module:
+            entries.insert(0, ('function', f'src.handlers.{handler_module}'))
+        for label, module in entries:
+            # A fresh event for the warm call too, so e.g. delete does not hit its 404 path
+            samples = [_measure(module, make_event(), make_event()) for _ in range(runs)]
+            best = min(samples, key=lambda sample: sample['init_ms'])
+            logger.info(f"{name:<14} {label:<10} {best['status']:>6} {best['import_ms']:>10.1f} "
+                        f"{best['init_ms']:>9.1f} {best['warm_ms']:>8.1f} {best['modules']:>8} "
+                        f"{best['boto3_at_import']}")
+
+if __name__ == "__main__":
+    benchmark_cold_start()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import json
+import timeit
+import sys
+import os
+from decimal import Decimal
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils import serializer
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def build_page(count: int = 1000) -> dict:
+    """Build a list_images response page shaped like DynamoDB output"""
+    items = [{
+        'image_id': f'00000000-0000-0000-0000-{i:012d}',
+        'user_id': f'user{i % 50}',
+        'title': f'Image {i}',
+        'description': 'A sample image description',
+        'tags': {'nature', 'travel', f'tag{i % 10}'},
+        'content_type': 'image/jpeg',
+        'created_at': '2023-01-01T00:00:00+00:00',
+        'width': Decimal(1920),
+        'height': Decimal(1080),
+        'size_bytes': Decimal(524288 + i)
+    } for i in range(count)]
+    return {'images': items, 'count': count}
+
+def _stdlib_default(obj):
+    # The hook a plain json.dumps caller needs for DynamoDB items
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(type(obj).__name__)
+
+def benchmark_serializer(count: int = 1000, repeat: int = 5, number: int = 20) -> None:
+    """Compare json.dumps with a default hook against the serializer module"""
+    page = build_page(count)
+    logger.info(f"Serialising {count}-item pages (serializer backend: {serializer.BACKEND})")
+
+    candidates = {
+        'json.dumps(default=...)': lambda: json.dumps(page, default=_stdlib_default),
+        f'serializer.dumps [{serializer.BACKEND}]': lambda: serializer.dumps(page),
+        f'serializer.dumps_bytes [{serializer.BACKEND}]': lambda: serializer.dumps_bytes(page),
+    }
+
+    baseline = None
+    for name, func in candidates.items():
+        best = min(timeit.repeat(func, repeat=repeat, number=number)) / number
+        baseline = baseline or best
+        logger.info(f"{name:<40} {best * 1000:8.3f} ms/page  {baseline / best:5.2f}x")
+
+if __name__ == "__main__":
+    benchmark_serializer()
@@ -1,66 +1,157 @@
 #!/usr/bin/env python3
 
+import ast
 import boto3
+import importlib.util
+import py_compile
+import tempfile
 import zipfile
 import os
 import sys
-from pathlib import Path
+from typing import List, Optional, Set
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.utils.logger import get_logger
+from src.handlers.router import ROUTES
 
 logger = get_logger(__name__)
 
-def create_deployment_package():
-    """Create a deployment package for Lambda functions"""
+# Runtime the functions are deployed with; bytecode is only shipped when the
+# local interpreter matches it, since .pyc files are version specific
+LAMBDA_RUNTIME = 'python3.9'
+
+ROUTER_HANDLER_MODULES = sorted(set(ROUTES.values()))
+
+FUNCTIONS = [
+    {
+        'name': 'upload-image',
+        'handler': 'src.handlers.upload_image.lambda_handler',
+        'description': 'Upload image to S3 and save metadata'
+    },
+    {
+        'name': 'list-images', 
+        'handler': 'src.handlers.list_images.lambda_handler',
+        'description': 'List images with optional filters'
+    },
+    {
+        'name': 'view-image',
+        'handler': 'src.handlers.view_image.lambda_handler', 
+        'description': 'View/download a specific image'
+    },
+    {
+        'name': 'delete-image',
+        'handler': 'src.handlers.delete_image.lambda_handler',
+        'description': 'Delete an image and its metadata'
+    }
+]
+
+ROUTER_FUNCTION = {
+    'name': 'image-router',
+    'handler': 'src.handlers.router.lambda_handler',
+    'description': 'Route all image API requests through a single function'
+}
+
+def _module_path(module: str) -> Optional[str]:
+    """Map a dotted src.* module name to its source file"""
+    base = os.path.join(*module.split('.'))
+    for candidate in (base + '.py', os.path.join(base, '__init__.py')):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+def _local_imports(module: str, path: str) -> Set[str]:
+    """Find the src.* modules imported by a source file, including lazy and importlib imports"""
+    package = module if path.endswith('__init__.py') else module.rsplit('.', 1)[0]
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.rsplit('.', node.level - 1)[0] if node.level > 1 else package
+                base = f"{base}.{node.module}" if node.module else base
+            else:
+                base = node.module or ''
+            found.add(base)
+            found.update(f"{base}.{alias.name}" for alias in node.names)
+    if module == 'src.handlers.router':
+        # The router imports its handlers by name at request time
+        found.update(f"src.handlers.{name}" for name in ROUTER_HANDLER_MODULES)
+    return {name for name in found if name.split('.')[0] == 'src' and _module_path(name)}
+
+def _required_files(entry_modules: List[str]) -> List[str]:
+    """Resolve the source files needed by the entry modules, including parent packages"""
+    seen: Set[str] = set()
+    pending = list(entry_modules)
+    while pending:
+        module = pending.pop()
+        if module in seen:
+            continue
+        seen.add(module)
+        parts = module.split('.')
+        pending.extend('.'.join(parts[:i]) for i in range(1, len(parts)))
+        pending.extend(_local_imports(module, _module_path(module)))
+    return sorted(_module_path(module) for module in seen)
+
+def create_deployment_package(entry_modules: Optional[List[str]] = None, precompile: bool = True):
+    """Create a deployment package for Lambda functions
+
+    With entry_modules only the src modules they (transitively) import are
+    packaged; otherwise every Python file under src is. When the local Python
+    matches LAMBDA_RUNTIME, precompiled bytecode is added so the function does
+    not compile its modules on a cold start.
+    """
     logger.info("Creating deployment package...")
-    
+
+    if entry_modules:
+        source_files = _required_files(entry_modules)
+    else:
+        source_files = []
+        for root, dirs, files in os.walk('src'):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            source_files.extend(os.path.join(root, file) for file in files if file.endswith('.py'))
+
+    runtime_version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    if precompile and runtime_version != LAMBDA_RUNTIME:
+        logger.warning(f"Local {runtime_version} does not match {LAMBDA_RUNTIME}; skipping bytecode")
+        precompile = False
+
     # Create a zip file with the source code
     with zipfile.ZipFile('lambda_package.zip', 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Add all Python files from src directory
-        for root, dirs, files in os.walk('src'):
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    arcname = file_path
-                    zipf.write(file_path, arcname)
-    
-    logger.info("Deployment package created: lambda_package.zip")
+        for file_path in source_files:
+            zipf.write(file_path, file_path)
+            if precompile:
+                # Unchecked-hash pycs stay valid whatever timestamps the zip records
+                with tempfile.TemporaryDirectory() as tmp:
+                    compiled = py_compile.compile(
+                        file_path,
+                        cfile=os.path.join(tmp, 'module.pyc'),
+                        doraise=True,
+                        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH
+                    )
+                    zipf.write(compiled, importlib.util.cache_from_source(file_path))
+
+    logger.info(f"Deployment package created: lambda_package.zip ({len(source_files)} modules)")
     return 'lambda_package.zip'
 
-def deploy_lambda_functions():
-    """Deploy Lambda functions to LocalStack"""
+def deploy_lambda_functions(router: bool = False):
+    """Deploy Lambda functions to LocalStack
+
+    With router=True a single function serves every route, so traffic keeps
+    one set of containers warm instead of four.
+    """
     lambda_client = boto3.client('lambda', endpoint_url='http://localhost:4566')
     
-    # Create deployment package
-    zip_file = create_deployment_package()
+    functions = [ROUTER_FUNCTION] if router else FUNCTIONS
+    
+    # Create deployment package with only the modules the functions import
+    zip_file = create_deployment_package([func['handler'].rsplit('.', 1)[0] for func in functions])
     
     # Read the zip file
     with open(zip_file, 'rb') as f:
         zip_content = f.read()
     
-    functions = [
-        {
-            'name': 'upload-image',
-            'handler': 'src.handlers.upload_image.lambda_handler',
-            'description': 'Upload image to S3 and save metadata'
-        },
-        {
-            'name': 'list-images', 
-            'handler': 'src.handlers.list_images.lambda_handler',
-            'description': 'List images with optional filters'
-        },
-        {
-            'name': 'view-image',
-            'handler': 'src.handlers.view_image.lambda_handler', 
-            'description': 'View/download a specific image'
-        },
-        {
-            'name': 'delete-image',
-            'handler': 'src.handlers.delete_image.lambda_handler',
-            'description': 'Delete an image and its metadata'
-        }
-    ]
-    
     for func in functions:
         try:
             # Try to update if exists, otherwise create
@@ -79,7 +170,7 @@ def deploy_lambda_functions():
                 # Create new function
                 lambda_client.create_function(
                     FunctionName=func['name'],
-                    Runtime='python3.9',
+                    Runtime=LAMBDA_RUNTIME,
                     Role='arn:aws:iam::000000000000:role/lambda-role',
                     Handler=func['handler'],
                     Code={'ZipFile': zip_content},
@@ -101,4 +192,4 @@ def deploy_lambda_functions():
     logger.info("Lambda deployment complete!")
 
 if __name__ == "__main__":
-    deploy_lambda_functions()
\ No newline at end of file
+    deploy_lambda_functions(router='--router' in sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import math
+import multiprocessing
+import queue
+import random
+import time
+import sys
+import os
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.utils.logger import get_logger
+from infrastructure.sample_data import SAMPLE_PNG
+
+logger = get_logger(__name__)
+
+DEFAULT_MIX = 'upload=1,list=2,list_user=3,view=10,delete=1'
+
+# How often run_load checks that workers are still alive while waiting for results
+WORKER_POLL_SECONDS = 1.0
+
+class LatencyHistogram:
+    """HDR-style histogram: log-linear microsecond buckets with bounded relative error.
+
+    Every power-of-two range is split into 2**SUB_BUCKET_BITS linear buckets, so a
+    recorded value is off by at most 1/2**(SUB_BUCKET_BITS - 1) (about 1.6%) whatever
+    its magnitude. Histograms from different processes merge by adding counts.
+    """
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = defaultdict(int, counts or {})
+        self.total = sum(self.counts.values())
+        self.sum_us = 0
+        self.max_us = 0
+
+    def _index(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self.SUB_BUCKET_BITS)
+        return (shift << self.SUB_BUCKET_BITS) | (value >> shift)
+
+    def _highest_equivalent(self, index: int) -> int:
+        shift = index >> self.SUB_BUCKET_BITS
+        sub = index & ((1 << self.SUB_BUCKET_BITS) - 1)
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        value = max(0, int(seconds * 1_000_000))
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum_us += value
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for index, count in other.counts.items():
+            self.counts[index] += count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percent: float) -> float:
+        """Latency in milliseconds at the given percentile"""
+        if not self.total:
+            return 0.0
+        target = max(1, math.ceil(self.total * percent / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+            'max': self.max_us / 1000,
+            'mean': self.sum_us / self.total / 1000 if self.total else 0.0,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'counts': {str(index): count for index, count in sorted(self.counts.items())},
+                'sum_us': self.sum_us, 'max_us': self.max_us}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        histogram = cls({int(index): count for index, count in data['counts'].items()})
+        histogram.sum_us = data['sum_us']
+        histogram.max_us = data['max_us']
+        return histogram
+
+# Targets: each sends (method, path, query, body, headers) and returns (status, parsed JSON body or None)
+
+class HttpTarget:
+    """A running api_server (or any deployment exposing the same routes)"""
+
+    def __init__(self, base_url: str):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    def send(self, method, path, query, body, headers):
+        response = self.session.request(method, self.base_url + path, params=query, json=body,
+                                        headers=headers, timeout=30)
+        return response.status_code, _json_or_none(response.headers.get('content-type'), response.content)
+
+class AppTarget:
+    """The FastAPI app in-process, without a network hop"""
+
+    def __init__(self):
+        from fastapi.testclient import TestClient
+        import api_server
+        self.client = TestClient(api_server.app)
+
+    def send(self, method, path, query, body, headers):
+        response = self.client.request(method, path, params=query, json=body, headers=headers)
+        return response.status_code, _json_or_none(response.headers.get('content-type'), response.content)
+
+class HandlerTarget:
+    """Lambda handlers called directly through the router with API Gateway-shaped events"""
+
+    def __init__(self):
+        from src.handlers import router
+        self.router = router
+
+    def send(self, method, path, query, body, headers):
+        event = {
+            'httpMethod': method,
+            'path': path,
+            'headers': headers,
+            'queryStringParameters': query or None,
+            'body': json.dumps(body) if body is not None else None,
+        }
+        result = self.router.lambda_handler(event, None)
+        return result['statusCode'], _json_or_none(result['headers'].get('Content-Type'), result['body'])
+
+def _json_or_none(content_type: Optional[str], content) -> Optional[Any]:
+    if content_type and content_type.startswith('application/json'):
+        try:
+            return json.loads(content)
+        except ValueError:
+            return None
+    return None
+
+def create_target(name: str, base_url: str):
+    if name == 'http':
+        return HttpTarget(base_url)
+    if name == 'app':
+        return AppTarget()
+    if name == 'handler':
+        return HandlerTarget()
+    raise ValueError(f"Unknown target: {name}")
+
+def endpoint_label(method: str, path: str) -> str:
+    """Group concrete paths such as /images/<id> under their route"""
+    parts = path.strip('/').split('/')
+    if len(parts) == 2 and parts[0] == 'images':
+        return f"{method} /images/{{image_id}}"
+    return f"{method} {path}"
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    """Parse 'upload=1,view=10' into (operation, weight) pairs"""
+    weights = []
+    for part in mix.split(','):
+        operation, _, weight = part.partition('=')
+        if operation.strip() not in ('upload', 'list', 'list_user', 'view', 'delete'):
+            raise ValueError(f"Unknown operation in mix: {operation}")
+        weights.append((operation.strip(), float(weight or 1)))
+    return weights
+
+class RequestSource:
+    """Builds requests for one worker, tracking the image ids it has uploaded.
+
+    Every request is sent as one of the simulated users (X-User-Id header), so
+    api_server's admission control sees many clients instead of one IP.
+    """
+
+    def __init__(self, seed: int, users: int):
+        self.rng = random.Random(seed)
+        self.users = [f'loadgen_user_{i}' for i in range(users)]
+        self.image_ids: List[str] = []
+
+    def _request(self, method: str, path: str, query=None, body=None, user: Optional[str] = None):
+        return method, path, query, body, {'X-User-Id': user or self.rng.choice(self.users)}
+
+    def _upload(self, user: Optional[str] = None):
+        user = user or self.rng.choice(self.users)
+        body = {'image': SAMPLE_PNG, 'metadata': {'user_id': user, 'tags': ['loadgen']}}
+        return self._request('POST', '/images', body=body, user=user)
+
+    def build(self, operation: str):
+        if operation == 'upload':
+            return self._upload()
+        if operation == 'list':
+            return self._request('GET', '/images')
+        if operation == 'list_user':
+            user = self.rng.choice(self.users)
+            return self._request('GET', '/images', query={'user_id': user}, user=user)
+        if not self.image_ids:
+            # Nothing to view or delete yet
+            return self._upload()
+        if operation == 'view':
+            return self._request('GET', f"/images/{self.rng.choice(self.image_ids)}")
+        image_id = self.image_ids.pop(self.rng.randrange(len(self.image_ids)))
+        return self._request('DELETE', f"/images/{image_id}")
+
+    def from_trace(self, entry: Dict[str, Any]):
+        """Turn a trace line into a request; '{image_id}' in the path picks an uploaded image.
+
+        An optional 'user_id' sends the request as that user; otherwise a simulated user is picked.
+        """
+        method = entry.get('method', 'GET').upper()
+        path = entry['path']
+        user = entry.get('user_id')
+        if '{image_id}' in path:
+            if not self.image_ids:
+                return self._upload(user)
+            if method == 'DELETE':
+                image_id = self.image_ids.pop(self.rng.randrange(len(self.image_ids)))
+            else:
+                image_id = self.rng.choice(self.image_ids)
+            path = path.replace('{image_id}', image_id)
+        body = entry.get('body')
+        if method == 'POST' and path == '/images' and body is None:
+            return self._upload(user)
+        return self._request(method, path, entry.get('query'), body, user)
+
+    def observe(self, method: str, path: str, status: int, body: Optional[Any]) -> None:
+        if method == 'POST' and path == '/images' and status < 300 and isinstance(body, dict):
+            self.image_ids.append(body['image_id'])
+
+def _run_worker(worker: int, config: Dict[str, Any], trace: Optional[List[Dict[str, Any]]], results) -> None:
+    target = create_target(config['target'], config['url'])
+    source = RequestSource(config['seed'] + worker, config['users'])
+    mix = parse_mix(config['mix'])
+    operations = [operation for operation, _ in mix]
+    weights = [weight for _, weight in mix]
+
+    histograms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    interval = config['processes'] / config['rate'] if config['rate'] else 0.0
+
+    def requests_to_send() -> Iterator[Tuple]:
+        if trace is not None:
+            for entry in trace:
+                yield source.from_trace(entry)
+        else:
+            while True:
+                yield source.build(source.rng.choices(operations, weights)[0])
+
+    start = time.perf_counter()
+    deadline = start + config['duration']
+    # Stagger workers so paced requests do not all fire at the same instant
+    next_send = start + interval * worker / config['processes']
+    for method, path, query, body, headers in requests_to_send():
+        if interval:
+            now = time.perf_counter()
+            if next_send > now:
+                time.sleep(next_send - now)
+            scheduled = next_send
+            next_send += interval
+        else:
+            scheduled = time.perf_counter()
+        if scheduled >= deadline:
+            break
+
+        label = endpoint_label(method, path)
+        try:
+            status, response_body = target.send(method, path, query, body, headers)
+        except Exception as e:
+            status, response_body = 'exception', None
+            logger.debug(f"{label} failed: {e}")
+        # Measured from the scheduled send time so a slow server cannot hide its
+        # queueing delay by holding back the next request (coordinated omission)
+        histograms[label].record(time.perf_counter() - scheduled)
+        statuses[label][str(status)] += 1
+        if isinstance(status, int):
+            source.observe(method, path, status, response_body)
+
+    results.put({
+        'worker': worker,
+        'elapsed': time.perf_counter() - start,
+        'histograms': {label: histogram.to_dict() for label, histogram in histograms.items()},
+        'statuses': {label: dict(counter) for label, counter in statuses.items()},
+    })
+
+def _is_shed(status: str) -> bool:
+    # Rejected by admission control rather than failed
+    return status == '429'
+
+def _is_error(status: str) -> bool:
+    return not status.isdigit() or (int(status) >= 400 and not _is_shed(status))
+
+def _collect_results(workers: List, results) -> List[Dict[str, Any]]:
+    """Wait for one result per worker, failing fast if a worker dies without reporting"""
+    worker_results: Dict[int, Dict[str, Any]] = {}
+    while len(worker_results) < len(workers):
+        try:
+            result = results.get(timeout=WORKER_POLL_SECONDS)
+        except queue.Empty:
+            for index, worker in enumerate(workers):
+                if index not in worker_results and worker.exitcode not in (None, 0):
+                    for other in workers:
+                        if other.is_alive():
+                            other.terminate()
+                    raise RuntimeError(f"Worker {worker.name} exited with code {worker.exitcode} "
+                                       f"before reporting results")
+            continue
+        worker_results[result['worker']] = result
+    return list(worker_results.values())
+
+def run_load(config: Dict[str, Any], trace: Optional[List[Dict[str, Any]]] = None,
+             start_method: str = 'spawn') -> Dict[str, Any]:
+    """Run the load generator and return a report.
+
+    Workers are spawned fresh by default; 'fork' lets them inherit in-process
+    state such as the moto mocks the tests run under.
+    """
+    context = multiprocessing.get_context(start_method)
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=_run_worker,
+            args=(i, config, trace[i::config['processes']] if trace is not None else None, results),
+            name=f'loadgen-worker-{i}'
+        )
+        for i in range(config['processes'])
+    ]
+    for worker in workers:
+        worker.start()
+    # Drain the queue before joining so workers never block on a full pipe
+    worker_results = _collect_results(workers, results)
+    for worker in workers:
+        worker.join()
+
+    elapsed = max(result['elapsed'] for result in worker_results)
+    histograms: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    for result in worker_results:
+        for label, data in result['histograms'].items():
+            histograms[label].merge(LatencyHistogram.from_dict(data))
+        for label, counts in result['statuses'].items():
+            statuses[label].update(counts)
+
+    endpoints = {}
+    for label in sorted(histograms):
+        count = histograms[label].total
+        errors = sum(n for status, n in statuses[label].items() if _is_error(status))
+        shed = sum(n for status, n in statuses[label].items() if _is_shed(status))
+        endpoints[label] = {
+            'requests': count,
+            'errors': errors,
+            'error_rate': errors / count if count else 0.0,
+            'shed': shed,
+            'shed_rate': shed / count if count else 0.0,
+            'throughput_rps': count / elapsed if elapsed else 0.0,
+            'latency_ms': histograms[label].summary(),
+            'statuses': dict(statuses[label]),
+            'histogram': histograms[label].to_dict(),
+        }
+
+    total = sum(endpoint['requests'] for endpoint in endpoints.values())
+    errors = sum(endpoint['errors'] for endpoint in endpoints.values())
+    shed = sum(endpoint['shed'] for endpoint in endpoints.values())
+    overall = LatencyHistogram()
+    for histogram in histograms.values():
+        overall.merge(histogram)
+    return {
+        'config': config,
+        'duration_s': elapsed,
+        'requests': total,
+        'errors': errors,
+        'error_rate': errors / total if total else 0.0,
+        'shed': shed,
+        'shed_rate': shed / total if total else 0.0,
+        'throughput_rps': total / elapsed if elapsed else 0.0,
+        'latency_ms': overall.summary(),
+        'endpoints': endpoints,
+    }
+
+def _change(current: float, previous: float) -> str:
+    if not previous:
+        return '     n/a'
+    return f"{(current - previous) / previous:+8.1%}"
+
+def log_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """Log a per-endpoint summary, with changes against a previous report if given"""
+    logger.info(f"{report['requests']} requests in {report['duration_s']:.1f}s: "
+                f"{report['throughput_rps']:.1f} req/s, error rate {report['error_rate']:.2%}, "
+                f"shed (429) {report['shed_rate']:.2%}")
+    rows = dict(report['endpoints'], **{'ALL': report})
+    for label, endpoint in rows.items():
+        latency = endpoint['latency_ms']
+        logger.info(f"{label:<28} {endpoint['requests']:>7} req {endpoint['throughput_rps']:>8.1f} req/s "
+                    f"err {endpoint['error_rate']:>6.2%}  shed {endpoint['shed_rate']:>6.2%}  p50 {latency['p50']:>8.2f}  "
+                    f"p99 {latency['p99']:>8.2f}  p999 {latency['p999']:>8.2f}  max {latency['max']:>8.2f} ms")
+        previous = baseline and (baseline if label == 'ALL' else baseline['endpoints'].get(label))
+        if previous:
+            logger.info(f"{'  vs baseline':<28} {'':>7}     {_change(endpoint['throughput_rps'], previous['throughput_rps'])}"
+                        f"        {'':>6}  {'':>11}      {_change(latency['p50'], previous['latency_ms']['p50'])}"
+                        f"      {_change(latency['p99'], previous['latency_ms']['p99'])}"
+                        f"       {_change(latency['p999'], previous['latency_ms']['p999'])}")
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """Read a JSONL trace: one request per line with method, path and optional query/body"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Replay a request mix or trace against the image API')
+    parser.add_argument('--target', choices=('http', 'app', 'handler'), default='http',
+                        help="http: a running server at --url; app: the FastAPI app in-process; "
+                             "handler: Lambda handlers called directly. app and handler use the AWS "
+                             "endpoint ImageService is configured with (LocalStack or a moto server)")
+    parser.add_argument('--url', default='http://localhost:8000', help='Base URL for the http target')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Weighted request mix (default: {DEFAULT_MIX})')
+    parser.add_argument('--trace', help='JSONL trace to replay instead of the mix')
+    parser.add_argument('--processes', type=int, default=4, help='Worker processes (closed-loop concurrency)')
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='Target total requests per second (open loop); 0 sends back-to-back')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run for')
+    parser.add_argument('--users', type=int, default=100, help='Distinct user_ids to spread requests over')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the JSON report here')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    args = parser.parse_args(argv)
+
+    config = {
+        'target': args.target, 'url': args.url, 'mix': args.mix, 'trace': args.trace,
+        'processes': args.processes, 'rate': args.rate, 'duration': args.duration,
+        'users': args.users, 'seed': args.seed,
+    }
+    parse_mix(args.mix)
+    trace = load_trace(args.trace) if args.trace else None
+
+    logger.info(f"Running {args.processes} workers against {args.target} for {args.duration}s "
+                f"({'%.1f req/s' % args.rate if args.rate else 'closed loop'})")
+    report = run_load(config, trace)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    log_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""Payloads shared by the deployment, benchmark and load scripts"""
+
+# 1x1 PNG; uploads are validated against their header bytes
+SAMPLE_PNG = 'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=='
@@ -2,11 +2,11 @@
 
 import boto3
 import json
-import base64
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.utils.logger import get_logger
+from infrastructure.sample_data import SAMPLE_PNG
 
 logger = get_logger(__name__)
 
@@ -20,13 +20,13 @@ def test_lambda_functions():
     logger.info("1. Testing upload-image...")
     upload_payload = {
         'body': json.dumps({
-            'image': base64.b64encode(b'fake_image_data').decode(),
+            'image': SAMPLE_PNG,
             'metadata': {
                 'user_id': 'test_user_123',
                 'title': 'Test Image',
                 'description': 'A test image for LocalStack',
                 'tags': ['test', 'localstack'],
-                'content_type': 'image/jpeg'
+                'content_type': 'image/png'
             }
         })
     }
@@ -1,38 +1,41 @@
-import json
 from typing import Dict, Any
-from ..utils.image_service import ImageService
-from ..utils.response import create_response
+from ..utils.image_service import ImageService, is_throttling_error
+from ..utils.response import create_response, create_throttled_response
+from ..utils.tracing import span, traced_handler
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced_handler('delete_image')
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     service = ImageService()
     
     try:
         image_id = event['pathParameters']['image_id']
-        logger.info(f"Deleting image {image_id}")
+        logger.info("Deleting image %s", image_id)
         
         # Get metadata from DynamoDB
-        table = service.dynamodb.Table(service.table_name)
-        response = table.get_item(Key={'image_id': image_id})
+        metadata = service.get_image_metadata(image_id)
         
-        if 'Item' not in response:
-            logger.warning(f"Image {image_id} not found for deletion")
+        if metadata is None:
+            logger.warning("Image %s not found for deletion", image_id)
             return create_response(404, {'error': 'Image not found'})
         
-        metadata = response['Item']
         s3_key = metadata['s3_key']
         
-        # Delete from S3
-        service.s3.delete_object(Bucket=service.bucket_name, Key=s3_key)
+        # Delete from storage
+        with span('storage.delete'):
+            service.storage.delete(s3_key)
         
         # Delete from DynamoDB
-        table.delete_item(Key={'image_id': image_id})
+        service.delete_image_metadata(image_id)
         
-        logger.info(f"Successfully deleted image {image_id}")
+        logger.info("Successfully deleted image %s", image_id)
         return create_response(200, {'message': 'Image deleted successfully'})
         
     except Exception as e:
-        logger.error(f"Error deleting image {image_id}: {str(e)}")
+        if is_throttling_error(e):
+            logger.warning("Throttled while deleting image %s: %s", image_id, e)
+            return create_throttled_response()
+        logger.error("Error deleting image %s: %s", image_id, e)
         return create_response(500, {'error': str(e)})
\ No newline at end of file
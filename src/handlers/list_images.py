@@ -1,12 +1,12 @@
-import json
 from typing import Dict, Any
-from boto3.dynamodb.conditions import Key
-from ..utils.image_service import ImageService
-from ..utils.response import create_response
+from ..utils.image_service import ImageService, is_throttling_error
+from ..utils.response import create_response, create_throttled_response
+from ..utils.tracing import traced_handler
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced_handler('list_images')
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     service = ImageService()
     
@@ -15,21 +15,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         user_id = params.get('user_id')
         tag = params.get('tag')
         
-        logger.info(f"Listing images with filters - user_id: {user_id}, tag: {tag}")
+        logger.info("Listing images with filters - user_id: %s, tag: %s", user_id, tag)
         
-        table = service.dynamodb.Table(service.table_name)
-        
-        if user_id:
-            # Filter by user_id using GSI
-            response = table.query(
-                IndexName='user-index',
-                KeyConditionExpression=Key('user_id').eq(user_id)
-            )
-        else:
-            # Scan all items
-            response = table.scan()
-        
-        items = response['Items']
+        # Query the user-index GSI when filtering by user_id, otherwise scan
+        items = service.list_image_metadata(user_id)
         
         # Additional filtering by tag
         if tag:
@@ -39,9 +28,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         for item in items:
             item.pop('s3_key', None)
             
-        logger.info(f"Found {len(items)} images")
+        logger.info("Found %d images", len(items))
         return create_response(200, {'images': items, 'count': len(items)})
         
     except Exception as e:
-        logger.error(f"Error listing images: {str(e)}")
+        if is_throttling_error(e):
+            logger.warning("Throttled while listing images: %s", e)
+            return create_throttled_response()
+        logger.error("Error listing images: %s", e)
         return create_response(500, {'error': str(e)})
\ No newline at end of file
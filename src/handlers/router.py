@@ -0,0 +1,70 @@
+import importlib
+from typing import Dict, Any, Optional, Tuple
+from ..utils.response import create_response
+from ..utils.tracing import set_route, traced_handler
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (method, resource) -> handler module. Modules are imported on first use, so a
+# cold start only pays for boto3 and friends once a route actually needs them.
+ROUTES = {
+    ('POST', '/images'): 'upload_image',
+    ('GET', '/images'): 'list_images',
+    ('GET', '/images/{image_id}'): 'view_image',
+    ('DELETE', '/images/{image_id}'): 'delete_image',
+}
+
+_handlers: Dict[str, Any] = {}
+
+def _get_handler(module_name: str):
+    handler = _handlers.get(module_name)
+    if handler is None:
+        module = importlib.import_module(f'{__package__}.{module_name}')
+        handler = _handlers[module_name] = module.lambda_handler
+    return handler
+
+def _match_route(event: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, str]]:
+    """Resolve an API Gateway (REST or HTTP API) event to a handler module and path parameters"""
+    request_context = event.get('requestContext', {})
+    http = request_context.get('http', {})
+    method = (event.get('httpMethod') or http.get('method') or '').upper()
+
+    resource = event.get('resource')
+    if resource in ('/images', '/images/{image_id}'):
+        return ROUTES.get((method, resource)), event.get('pathParameters') or {}
+
+    # HTTP API routes are keyed like 'GET /images/{image_id}'; catch-all routes
+    # such as '$default' or 'ANY /{proxy+}' fall through to the path
+    route_key = event.get('routeKey') or ''
+    _, _, resource = route_key.partition(' ')
+    if resource in ('/images', '/images/{image_id}'):
+        return ROUTES.get((method, resource)), event.get('pathParameters') or {}
+
+    path = event.get('path')
+    if path is None:
+        # rawPath includes the stage name on any stage other than $default
+        path = event.get('rawPath') or ''
+        stage = request_context.get('stage')
+        if stage and stage != '$default' and path.startswith(f'/{stage}/'):
+            path = path[len(stage) + 1:]
+    path = path.rstrip('/')
+    parts = path.strip('/').split('/')
+    if parts == ['images']:
+        return ROUTES.get((method, '/images')), {}
+    if len(parts) == 2 and parts[0] == 'images' and parts[1]:
+        return ROUTES.get((method, '/images/{image_id}')), {'image_id': parts[1]}
+    return None, {}
+
+@traced_handler('router')
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    module_name, path_parameters = _match_route(event)
+    if module_name is None:
+        logger.warning("No route for %s %s", event.get('httpMethod'), event.get('path') or event.get('rawPath'))
+        return create_response(404, {'error': 'Route not found'})
+
+    # Record metrics per route rather than all under 'router'
+    set_route(module_name)
+    if path_parameters and not event.get('pathParameters'):
+        event = dict(event, pathParameters=path_parameters)
+    return _get_handler(module_name)(event, context)
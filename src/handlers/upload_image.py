@@ -1,19 +1,23 @@
-import json
 import base64
 import uuid
 from datetime import datetime, timezone
 from typing import Dict, Any
-from ..utils.image_service import ImageService
-from ..utils.response import create_response
+from ..utils.image_service import ImageService, is_throttling_error
+from ..utils.response import create_response, create_throttled_response
+from ..utils.serializer import loads
+from ..utils.image_sniffer import SNIFF_BYTES, base64_header, sniff_image, normalize_content_type
+from ..utils.tracing import span, traced_handler
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced_handler('upload_image')
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     service = ImageService()
 
     try:
-        body = json.loads(event['body'])
+        with span('deserialize'):
+            body = loads(event['body'])
         image_data_raw = body['image']
         metadata = body['metadata']
 
@@ -22,37 +26,63 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             # Extract base64 part after comma
             image_data_raw = image_data_raw.split(',', 1)[1]
 
-        image_data = base64.b64decode(image_data_raw)
+        # Validate the payload from its header bytes before decoding all of it
+        # or writing anything
+        with span('image.sniff'):
+            image_info = sniff_image(base64_header(image_data_raw))
+        if image_info is None:
+            logger.warning("Rejected upload with unsupported image format")
+            return create_response(400, {'error': 'Unsupported image format'})
+
+        declared_type = metadata.get('content_type')
+        if declared_type and normalize_content_type(declared_type) != image_info.content_type:
+            logger.warning("Rejected upload declared as %s but detected as %s", declared_type, image_info.content_type)
+            return create_response(400, {
+                'error': f"Content type mismatch: declared {declared_type}, detected {image_info.content_type}"
+            })
+        content_type = image_info.content_type
+
+        with span('base64.decode'):
+            image_data = base64.b64decode(image_data_raw)
+
+        if image_info.width is None and len(image_data) > SNIFF_BYTES:
+            # Large EXIF/ICC/XMP segments can push a JPEG's frame header past the prefix
+            with span('image.sniff'):
+                image_info = sniff_image(image_data)
+        if image_info.width is None or image_info.height is None:
+            logger.warning("Rejected %s upload with unreadable dimensions", image_info.content_type)
+            return create_response(400, {'error': 'Could not read image dimensions'})
 
         image_id = str(uuid.uuid4())
         s3_key = f"images/{image_id}"
 
-        logger.info(f"Uploading image {image_id} for user {metadata['user_id']}")
+        logger.info("Uploading image %s for user %s", image_id, metadata['user_id'])
 
-        # Upload to S3
-        service.s3.put_object(
-            Bucket=service.bucket_name,
-            Key=s3_key,
-            Body=image_data,
-            ContentType=metadata.get('content_type', 'image/jpeg')
-        )
+        # Upload to image storage
+        with span('storage.put'):
+            service.storage.put(s3_key, image_data, content_type)
 
         # Save metadata to DynamoDB
-        table = service.dynamodb.Table(service.table_name)
-        table.put_item(Item={
+        service.put_image_metadata({
             'image_id': image_id,
             'user_id': metadata['user_id'],
             'title': metadata.get('title', ''),
             'description': metadata.get('description', ''),
             'tags': metadata.get('tags', []),
-            'content_type': metadata.get('content_type', 'image/jpeg'),
+            'content_type': content_type,
+            'width': image_info.width,
+            'height': image_info.height,
+            'size_bytes': len(image_data),
             'created_at': datetime.now(timezone.utc).isoformat(),
             's3_key': s3_key
         })
 
-        logger.info(f"Successfully uploaded image {image_id}")
+        logger.info("Successfully uploaded image %s", image_id)
         return create_response(201, {'image_id': image_id, 'message': 'Image uploaded successfully'})
 
     except Exception as e:
-        logger.error(f"Error uploading image: {str(e)}")
+        if is_throttling_error(e):
+            logger.warning("Throttled while uploading image: %s", e)
+            return create_throttled_response()
+        logger.error("Error uploading image: %s", e)
         return create_response(500, {'error': str(e)})
\ No newline at end of file
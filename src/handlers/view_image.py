@@ -1,45 +1,55 @@
-import json
 import base64
 from typing import Dict, Any
-from ..utils.image_service import ImageService
-from ..utils.response import create_response
+from ..utils.image_service import ImageService, is_throttling_error
+from ..utils.storage import ObjectNotFoundError
+from ..utils.response import create_response, create_throttled_response
+from ..utils.tracing import span, traced_handler
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@traced_handler('view_image')
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     service = ImageService()
     
     try:
         image_id = event['pathParameters']['image_id']
-        logger.info(f"Retrieving image {image_id}")
+        logger.info("Retrieving image %s", image_id)
         
         # Get metadata from DynamoDB
-        table = service.dynamodb.Table(service.table_name)
-        response = table.get_item(Key={'image_id': image_id})
+        metadata = service.get_image_metadata(image_id)
         
-        if 'Item' not in response:
-            logger.warning(f"Image {image_id} not found")
+        if metadata is None:
+            logger.warning("Image %s not found", image_id)
             return create_response(404, {'error': 'Image not found'})
         
-        metadata = response['Item']
         s3_key = metadata['s3_key']
         
-        # Get image from S3
-        s3_response = service.s3.get_object(Bucket=service.bucket_name, Key=s3_key)
-        image_data = s3_response['Body'].read()
+        # Get image from storage
+        try:
+            with span('storage.get'):
+                image_data = service.storage.get(s3_key)
+        except ObjectNotFoundError:
+            logger.warning("Image %s has metadata but no stored object", image_id)
+            return create_response(404, {'error': 'Image not found'})
+        
+        with span('base64.encode'):
+            encoded = base64.b64encode(image_data).decode('utf-8')
         
-        logger.info(f"Successfully retrieved image {image_id}")
+        logger.info("Successfully retrieved image %s", image_id)
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': metadata['content_type'],
                 'Content-Disposition': f'inline; filename="{image_id}"'
             },
-            'body': base64.b64encode(image_data).decode('utf-8'),
+            'body': encoded,
             'isBase64Encoded': True
         }
         
     except Exception as e:
-        logger.error(f"Error retrieving image {image_id}: {str(e)}")
+        if is_throttling_error(e):
+            logger.warning("Throttled while retrieving image %s: %s", image_id, e)
+            return create_throttled_response()
+        logger.error("Error retrieving image %s: %s", image_id, e)
         return create_response(500, {'error': str(e)})
\ No newline at end of file
@@ -1,13 +1,66 @@
 import boto3
-from typing import Optional
+import threading
+from typing import Any, Dict, List, Optional
+from boto3.dynamodb.conditions import Key
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from .logger import get_logger
+from .storage import StorageBackend, S3Storage, LocalStorage
+from .tracing import instrument_client
+from . import metrics
 import os
 
 logger = get_logger(__name__)
 
+# Error codes AWS uses when a request is rejected for exceeding capacity
+THROTTLING_ERROR_CODES = frozenset({
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'SlowDown',
+})
+
+# Adaptive mode adds client-side rate limiting on top of jittered exponential
+# backoff, so a throttled table slows callers down instead of failing them
+RETRY_CONFIG = Config(retries={
+    'mode': os.environ.get('AWS_RETRY_MODE', 'adaptive'),
+    'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '5'))
+})
+
+# Clients are shared by every thread in the process so the adaptive rate limiter
+# sees all of its traffic and keeps its state between requests. boto3 clients are
+# thread-safe; the DynamoDB resource is only used to create a fresh Table per call
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+def _get_aws_clients(endpoint: str):
+    clients = _clients.get(endpoint)
+    if clients is None:
+        with _clients_lock:
+            clients = _clients.get(endpoint)
+            if clients is None:
+                s3 = boto3.client('s3', endpoint_url=endpoint, config=RETRY_CONFIG)
+                dynamodb = boto3.resource('dynamodb', endpoint_url=endpoint, config=RETRY_CONFIG)
+                # Every S3 and DynamoDB call gets a timed span
+                instrument_client(s3)
+                instrument_client(dynamodb.meta.client)
+                clients = _clients[endpoint] = (s3, dynamodb)
+    return clients
+
+def is_throttling_error(error: Exception) -> bool:
+    """Check whether an exception is an AWS throttling error"""
+    return isinstance(error, ClientError) and error.response['Error']['Code'] in THROTTLING_ERROR_CODES
+
+def create_storage_backend(name: str, s3_client, bucket_name: str) -> StorageBackend:
+    """Build the storage backend selected by name ('s3' or 'local')"""
+    if name == 's3':
+        return S3Storage(s3_client, bucket_name)
+    if name == 'local':
+        return LocalStorage(os.environ.get('LOCAL_STORAGE_ROOT', 'local_storage'))
+    raise ValueError(f"Unknown storage backend: {name}")
+
 class ImageService:
-    def __init__(self, localstack_endpoint: Optional[str] = None):
+    def __init__(self, localstack_endpoint: Optional[str] = None, storage_backend: Optional[str] = None):
         # Use different endpoints for Lambda vs local testing
         if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
             # Running inside Lambda - use LocalStack internal endpoint
@@ -15,24 +68,18 @@ class ImageService:
         else:
             # Running locally - use localhost
             self.endpoint = localstack_endpoint or "http://localhost:4566"
-            
-        self.s3 = boto3.client('s3', endpoint_url=self.endpoint)
-        self.dynamodb = boto3.resource('dynamodb', endpoint_url=self.endpoint)
+
+        self.s3, self.dynamodb = _get_aws_clients(self.endpoint)
         self.bucket_name = 'instagram-images'
         self.table_name = 'image-metadata'
-        
+        self.storage = create_storage_backend(
+            storage_backend or os.environ.get('STORAGE_BACKEND', 's3'), self.s3, self.bucket_name
+        )
+
     def setup_resources(self) -> None:
-        """Setup S3 bucket and DynamoDB table"""
-        try:
-            self.s3.create_bucket(Bucket=self.bucket_name)
-            logger.info(f"Created S3 bucket: {self.bucket_name}")
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'BucketAlreadyOwnedByYou':
-                logger.info(f"S3 bucket {self.bucket_name} already exists")
-            else:
-                logger.error(f"Failed to create S3 bucket: {e}")
-                raise
-            
+        """Setup image storage and DynamoDB table"""
+        self.storage.setup()
+
         try:
             table = self.dynamodb.create_table(
                 TableName=self.table_name,
@@ -57,4 +104,50 @@ class ImageService:
                 logger.info(f"DynamoDB table {self.table_name} already exists")
             else:
                 logger.error(f"Failed to create DynamoDB table: {e}")
-                raise
\ No newline at end of file
+                raise
+
+    def _call_table(self, operation: str, **kwargs) -> Dict[str, Any]:
+        """Call a DynamoDB table operation, tracking consumed capacity and throttling"""
+        table = self.dynamodb.Table(self.table_name)
+        try:
+            response = getattr(table, operation)(ReturnConsumedCapacity='INDEXES', **kwargs)
+        except ClientError as e:
+            if is_throttling_error(e):
+                metrics.increment('dynamodb_throttled_requests_total', table=self.table_name, operation=operation)
+            raise
+        self._record_consumed_capacity(response.get('ConsumedCapacity'))
+        return response
+
+    def _record_consumed_capacity(self, consumed: Any) -> None:
+        if not consumed:
+            return
+        for entry in consumed if isinstance(consumed, list) else [consumed]:
+            table_name = entry.get('TableName', self.table_name)
+            metrics.increment('dynamodb_consumed_capacity_units_total', entry.get('CapacityUnits', 0), table=table_name)
+            for index_name, index in entry.get('GlobalSecondaryIndexes', {}).items():
+                metrics.increment('dynamodb_consumed_capacity_units_total', index.get('CapacityUnits', 0),
+                                  table=table_name, index=index_name)
+
+    def get_image_metadata(self, image_id: str) -> Optional[Dict[str, Any]]:
+        """Get the metadata item for an image, or None if it does not exist"""
+        return self._call_table('get_item', Key={'image_id': image_id}).get('Item')
+
+    def put_image_metadata(self, item: Dict[str, Any]) -> None:
+        """Save the metadata item for an image"""
+        self._call_table('put_item', Item=item)
+
+    def delete_image_metadata(self, image_id: str) -> None:
+        """Delete the metadata item for an image"""
+        self._call_table('delete_item', Key={'image_id': image_id})
+
+    def list_image_metadata(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List metadata items, using the user-index GSI when filtering by user"""
+        if user_id:
+            response = self._call_table(
+                'query',
+                IndexName='user-index',
+                KeyConditionExpression=Key('user_id').eq(user_id)
+            )
+        else:
+            response = self._call_table('scan')
+        return response['Items']
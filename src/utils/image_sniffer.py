@@ -0,0 +1,109 @@
+import base64
+import binascii
+import struct
+from typing import NamedTuple, Optional
+
+# Enough for every fixed-offset header we parse (PNG IHDR, GIF screen descriptor,
+# WebP VP8/VP8L/VP8X); only JPEG needs to walk further, segment by segment
+HEADER_BYTES = 32
+
+# Prefix of an upload decoded to sniff it before the full payload is decoded;
+# enough for the frame header of most JPEGs, which follows the EXIF/ICC segments
+SNIFF_BYTES = 64 * 1024
+
+# Aliases clients commonly send for the types we detect
+CONTENT_TYPE_ALIASES = {
+    'image/jpg': 'image/jpeg',
+    'image/pjpeg': 'image/jpeg',
+    'image/x-png': 'image/png',
+}
+
+# JPEG start-of-frame markers carry the dimensions; C4 (DHT), C8 (JPG) and CC (DAC) do not
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Standalone markers without a length field
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD8)) | {0x01}
+
+class ImageInfo(NamedTuple):
+    content_type: str
+    width: Optional[int]
+    height: Optional[int]
+
+def normalize_content_type(content_type: str) -> str:
+    """Lower-case a content type, drop parameters and resolve known aliases"""
+    content_type = content_type.split(';', 1)[0].strip().lower()
+    return CONTENT_TYPE_ALIASES.get(content_type, content_type)
+
+def _jpeg_dimensions(data: bytes):
+    # Jump from marker to marker using the segment lengths, never touching the
+    # compressed scan data
+    offset = 2
+    size = len(data)
+    while offset + 4 <= size:
+        if data[offset] != 0xFF:
+            return None, None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte
+            offset += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan before any frame header
+            return None, None
+        segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > size:
+                return None, None
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + segment_length
+    return None, None
+
+def _webp_dimensions(data: bytes):
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30 and data[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25 and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return width, height
+    return None, None
+
+def base64_header(encoded: str) -> bytes:
+    """Decode only the first SNIFF_BYTES of a base64 string"""
+    try:
+        return base64.b64decode(encoded[:(SNIFF_BYTES + 2) // 3 * 4])
+    except (binascii.Error, ValueError):
+        # The prefix did not end on a 4-character boundary (e.g. line-wrapped input)
+        return base64.b64decode(encoded)[:SNIFF_BYTES]
+
+def sniff_image(data: bytes) -> Optional[ImageInfo]:
+    """Detect the image type from its magic bytes and read its dimensions from the header.
+
+    Only header bytes are inspected; the image is never decoded. Returns None when
+    the data is not a JPEG, PNG, GIF or WebP image. Width and height are None when
+    the header is truncated or malformed.
+    """
+    if data[:3] == b'\xff\xd8\xff':
+        return ImageInfo('image/jpeg', *_jpeg_dimensions(data))
+
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        if len(data) >= 24 and data[12:16] == b'IHDR':
+            return ImageInfo('image/png', *struct.unpack('>II', data[16:24]))
+        return ImageInfo('image/png', None, None)
+
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        if len(data) >= 10:
+            return ImageInfo('image/gif', *struct.unpack('<HH', data[6:10]))
+        return ImageInfo('image/gif', None, None)
+
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return ImageInfo('image/webp', *_webp_dimensions(data[:HEADER_BYTES]))
+
+    return None
@@ -1,14 +1,57 @@
 import logging
 import os
+import random
+import zlib
+from .serializer import dumps
+from .tracing import current_request_id
 
 # Configure logging
 LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+# 'text' or 'json' (one structured object per line)
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+# Fraction of requests whose INFO/DEBUG logs are kept; warnings and errors always are
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+
+class RequestContextFilter(logging.Filter):
+    """Tag records with the current request ID and sample low-severity records per request.
+
+    Runs before formatting, so dropped records never pay for building their message.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = current_request_id()
+        record.request_id = request_id or '-'
+        if LOG_SAMPLE_RATE >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if request_id is None:
+            return random.random() < LOG_SAMPLE_RATE
+        # Keep or drop all of a request's logs together
+        return zlib.crc32(request_id.encode('utf-8')) % 10000 < LOG_SAMPLE_RATE * 10000
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return dumps(entry)
 
 logging.basicConfig(
     level=LOG_LEVEL,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(request_id)s - %(message)s'
 )
 
+# Also applies when the root logger was configured elsewhere (e.g. by the Lambda runtime)
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(RequestContextFilter())
+    if LOG_FORMAT == 'json':
+        _handler.setFormatter(JsonFormatter())
+
 def get_logger(name: str):
     """Get a logger instance"""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
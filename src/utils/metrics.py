@@ -0,0 +1,103 @@
+import bisect
+import math
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# METRICS_ENABLED=0 turns spans and histograms into no-ops
+ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+
+# Histogram bucket upper bounds in seconds, from 1 ms to 10 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# In-process counters and histograms, keyed by metric name and a sorted tuple of label pairs
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+_histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Labels]:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def increment(name: str, value: float = 1.0, **labels: str) -> None:
+    """Add value to a labelled counter"""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] += value
+
+def observe(name: str, value: float, **labels: str) -> None:
+    """Record a value (usually a duration in seconds) in a labelled histogram"""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    bucket = bisect.bisect_left(LATENCY_BUCKETS, value)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            # One count per bucket plus +Inf, followed by the running sum
+            histogram = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        histogram[bucket] += 1
+        histogram[-1] += value
+
+def get_counters() -> Dict[Tuple[str, Labels], float]:
+    """Return a snapshot of all counters"""
+    with _lock:
+        return dict(_counters)
+
+def get_counter(name: str, **labels: str) -> float:
+    """Return the current value of a single counter"""
+    with _lock:
+        return _counters.get(_key(name, labels), 0.0)
+
+def get_histogram_count(name: str, **labels: str) -> int:
+    """Return how many values a single histogram has recorded"""
+    with _lock:
+        histogram = _histograms.get(_key(name, labels))
+        return int(sum(histogram[:-1])) if histogram else 0
+
+def reset() -> None:
+    """Clear all counters and histograms"""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(values)) for key, values in _histograms.items())
+
+    lines = []
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f'# TYPE {name} counter')
+            typed.add(name)
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    for (name, labels), values in histograms:
+        if name not in typed:
+            lines.append(f'# TYPE {name} histogram')
+            typed.add(name)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (math.inf,), values[:-1]):
+            cumulative += count
+            le = (('le', _format_value(bound)),)
+            lines.append(f'{name}_bucket{_format_labels(labels, le)} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(values[-1])}')
+        lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
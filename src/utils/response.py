@@ -1,9 +1,20 @@
-import json
 from typing import Dict, Any
+from .serializer import dumps
+from .tracing import span
+
+# Seconds a client should wait before retrying a throttled request
+RETRY_AFTER_SECONDS = 1
 
 def create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
+    with span('serialize'):
+        serialized = dumps(body)
     return {
         'statusCode': status_code,
         'headers': {'Content-Type': 'application/json'},
-        'body': json.dumps(body)
-    }
\ No newline at end of file
+        'body': serialized
+    }
+
+def create_throttled_response(retry_after: int = RETRY_AFTER_SECONDS) -> Dict[str, Any]:
+    response = create_response(429, {'error': 'Too many requests, please retry later'})
+    response['headers']['Retry-After'] = str(retry_after)
+    return response
\ No newline at end of file
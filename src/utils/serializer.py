@@ -0,0 +1,77 @@
+import base64
+import json
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Union
+
+# orjson is an optional fast path; the stdlib json module is always available.
+# Set JSON_BACKEND=json to force the stdlib encoder.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+if os.environ.get('JSON_BACKEND', 'orjson') == 'json':
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Integer range orjson can encode (signed and unsigned 64-bit)
+_INT_MIN = -2 ** 63
+_INT_MAX = 2 ** 64 - 1
+
+def _default(obj: Any) -> Any:
+    """Convert types returned by DynamoDB that JSON cannot encode natively"""
+    if isinstance(obj, Decimal):
+        # DynamoDB returns every number as Decimal; keep integers as integers
+        if obj == obj.to_integral_value():
+            value = int(obj)
+            # orjson only encodes 64-bit integers while DynamoDB allows 38 digits;
+            # emit larger values as strings on both backends so output matches
+            if _INT_MIN <= value <= _INT_MAX:
+                return value
+            return str(value)
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    # DynamoDB B attributes come back as boto3's Binary wrapper; it can only
+    # exist once boto3.dynamodb.types is loaded, so avoid importing boto3 here
+    dynamodb_types = sys.modules.get('boto3.dynamodb.types')
+    if dynamodb_types is not None and isinstance(obj, dynamodb_types.Binary):
+        obj = obj.value
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode('ascii')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialise obj to UTF-8 encoded JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def dumps(obj: Any) -> str:
+        """Serialise obj to a JSON string"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(data: Union[str, bytes, bytearray]) -> Any:
+        """Parse a JSON document"""
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(default=_default)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialise obj to UTF-8 encoded JSON bytes"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    def dumps(obj: Any) -> str:
+        """Serialise obj to a JSON string"""
+        return _encoder.encode(obj)
+
+    def loads(data: Union[str, bytes, bytearray]) -> Any:
+        """Parse a JSON document"""
+        return json.loads(data)
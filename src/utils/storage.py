@@ -0,0 +1,182 @@
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterable, Optional
+from urllib.parse import quote
+from botocore.exceptions import ClientError
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+class ObjectNotFoundError(KeyError):
+    """Raised when a storage key does not exist"""
+
+class StorageBackend(ABC):
+    """Interface for the blob store that holds image bytes"""
+
+    @abstractmethod
+    def setup(self) -> None:
+        """Create the bucket or directory the backend stores objects in"""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        """Store data under key, replacing any existing object"""
+
+    @abstractmethod
+    def get_stream(self, key: str) -> BinaryIO:
+        """Open the object for reading; the caller must close the stream"""
+
+    @abstractmethod
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Read bytes start..end of the object, inclusive, like an HTTP Range header"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete the object; deleting a missing key is not an error"""
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """Delete several objects, batching requests where the backend allows"""
+
+    @abstractmethod
+    def presign(self, key: str, expires_in: int = 3600) -> str:
+        """Return a URL the object can be fetched from directly"""
+
+    def get(self, key: str) -> bytes:
+        """Read the whole object"""
+        stream = self.get_stream(key)
+        try:
+            return stream.read()
+        finally:
+            stream.close()
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Path of the object on the local filesystem, if the backend has one"""
+        return None
+
+class S3Storage(StorageBackend):
+    # DeleteObjects accepts at most 1000 keys per request
+    DELETE_BATCH_SIZE = 1000
+
+    def __init__(self, s3_client, bucket_name: str):
+        self.s3 = s3_client
+        self.bucket_name = bucket_name
+
+    def setup(self) -> None:
+        try:
+            self.s3.create_bucket(Bucket=self.bucket_name)
+            logger.info(f"Created S3 bucket: {self.bucket_name}")
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'BucketAlreadyOwnedByYou':
+                logger.info(f"S3 bucket {self.bucket_name} already exists")
+            else:
+                logger.error(f"Failed to create S3 bucket: {e}")
+                raise
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self.s3.put_object(Bucket=self.bucket_name, Key=key, Body=data, ContentType=content_type)
+
+    def _get_object(self, key: str, **kwargs):
+        try:
+            return self.s3.get_object(Bucket=self.bucket_name, Key=key, **kwargs)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                raise ObjectNotFoundError(key) from e
+            raise
+
+    def get_stream(self, key: str) -> BinaryIO:
+        return self._get_object(key)['Body']
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        body = self._get_object(key, Range=f'bytes={start}-{end}')['Body']
+        try:
+            return body.read()
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        self.s3.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        for i in range(0, len(keys), self.DELETE_BATCH_SIZE):
+            batch = keys[i:i + self.DELETE_BATCH_SIZE]
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+
+    def presign(self, key: str, expires_in: int = 3600) -> str:
+        return self.s3.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket_name, 'Key': key},
+            ExpiresIn=expires_in
+        )
+
+class LocalStorage(StorageBackend):
+    """Stores objects as files under root, sharded two levels deep by key hash"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def setup(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        logger.info(f"Using local storage directory: {self.root}")
+
+    def _path(self, key: str) -> str:
+        # Keys such as images/<uuid> become a single, traversal-safe file name
+        name = quote(key, safe='')
+        if name in ('', '.', '..'):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, digest[:2], digest[2:4], name)
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file in the same directory and rename it into
+        # place, so readers never observe a partially written object
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def get_stream(self, key: str) -> BinaryIO:
+        try:
+            return open(self._path(key), 'rb')
+        except FileNotFoundError as e:
+            raise ObjectNotFoundError(key) from e
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        with self.get_stream(key) as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.delete(key)
+
+    def presign(self, key: str, expires_in: int = 3600) -> str:
+        # Local files need no signature; expires_in is accepted for interface parity
+        return 'file://' + quote(self._path(key))
+
+    def local_path(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        return path if os.path.exists(path) else None
@@ -0,0 +1,151 @@
+import functools
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from . import metrics
+from .serializer import dumps
+
+# Emit CloudWatch embedded metric format lines; on by default inside Lambda
+EMF_ENABLED = os.environ.get('METRICS_EMF', '1' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else '0') == '1'
+EMF_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'ImageService')
+
+class RequestTrace:
+    """Spans recorded while serving one request"""
+    __slots__ = ('request_id', 'route', 'started_at', 'spans')
+
+    def __init__(self, request_id: str, route: str):
+        self.request_id = request_id
+        self.route = route
+        self.started_at = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar('current_request', default=None)
+
+def current_request_id() -> Optional[str]:
+    """Request ID of the request being served, if any"""
+    trace = _current.get()
+    return trace.request_id if trace else None
+
+def set_route(route: str) -> None:
+    """Label the current request with the route it was dispatched to"""
+    trace = _current.get()
+    if trace is not None:
+        trace.route = route
+
+def _record_span(name: str, duration: float) -> None:
+    metrics.observe('span_duration_seconds', duration, span=name)
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append((name, duration))
+
+class span:
+    """Time a block as a named span of the current request: ``with span('storage.get'): ...``"""
+    __slots__ = ('name', 'started_at')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> 'span':
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if metrics.ENABLED:
+            _record_span(self.name, time.perf_counter() - self.started_at)
+
+def _before_aws_call(model, context, **kwargs) -> None:
+    context['trace_started_at'] = time.perf_counter()
+
+def _after_aws_call(http_response, parsed, model, context, **kwargs) -> None:
+    started_at = context.pop('trace_started_at', None)
+    if started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    service = model.service_model.endpoint_prefix
+    metrics.observe('aws_call_duration_seconds', duration, service=service, operation=model.name)
+    if http_response.status_code >= 300:
+        code = parsed.get('Error', {}).get('Code', str(http_response.status_code))
+        metrics.increment('aws_call_errors_total', service=service, operation=model.name, code=code)
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append((f'{service}.{model.name}', duration))
+
+def instrument_client(client) -> None:
+    """Time every API call made through a boto3 client"""
+    if not metrics.ENABLED:
+        return
+    client.meta.events.register('before-call', _before_aws_call, unique_id='tracing-before-call')
+    client.meta.events.register('after-call', _after_aws_call, unique_id='tracing-after-call')
+
+def _request_id_from_event(event: Dict[str, Any], context: Any) -> str:
+    headers = event.get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == 'x-request-id' and value:
+            return value
+    request_id = (event.get('requestContext') or {}).get('requestId') or getattr(context, 'aws_request_id', None)
+    return request_id or str(uuid.uuid4())
+
+def _emit_emf(trace: RequestTrace, status_code: int, duration: float) -> None:
+    # Sum spans by name so repeated calls (e.g. two GetItems) become one metric
+    totals: Dict[str, float] = {}
+    for name, value in trace.spans:
+        totals[name] = totals.get(name, 0.0) + value
+    metric_values = {f'{name}.ms': round(value * 1000, 3) for name, value in totals.items()}
+    metric_values['Duration.ms'] = round(duration * 1000, 3)
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': EMF_NAMESPACE,
+                'Dimensions': [['Route']],
+                'Metrics': [{'Name': name, 'Unit': 'Milliseconds'} for name in metric_values],
+            }],
+        },
+        'Route': trace.route,
+        'RequestId': trace.request_id,
+        'StatusCode': status_code,
+        **metric_values,
+    }
+    sys.stdout.write(dumps(record) + '\n')
+
+@contextmanager
+def request_context(request_id: str, route: str) -> Iterator[RequestTrace]:
+    """Make request_id the current request for logs and spans within the block"""
+    trace = RequestTrace(request_id, route)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+def traced_handler(route: str) -> Callable:
+    """Wrap a Lambda handler so the request gets an ID, a duration metric and an EMF line.
+
+    Handlers called while another request is current (from the router or
+    api_server) are timed as a span of that request instead. A dispatching
+    handler can call set_route so metrics are labelled with the matched route.
+    """
+    def decorator(handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+            if _current.get() is not None:
+                with span(f'handler.{route}'):
+                    return handler(event, context)
+
+            with request_context(_request_id_from_event(event, context), route) as trace:
+                result = handler(event, context)
+                duration = time.perf_counter() - trace.started_at
+                status_code = result.get('statusCode', 0)
+                # The handler may have narrowed the route (see set_route)
+                metrics.observe('request_duration_seconds', duration, route=trace.route)
+                metrics.increment('requests_total', route=trace.route, status=str(status_code))
+                if EMF_ENABLED:
+                    _emit_emf(trace, status_code, duration)
+                result.setdefault('headers', {})['X-Request-Id'] = trace.request_id
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,114 @@
+import json
+import os
+import time
+import tracemalloc
+import pytest
+from src.utils.image_service import ImageService
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.environ.get('BENCHMARK_BASELINE', os.path.join(BENCHMARK_DIR, 'baseline.json'))
+RESULTS_PATH = os.environ.get('BENCHMARK_RESULTS', os.path.join(BENCHMARK_DIR, 'results.json'))
+UPDATE_BASELINE = os.environ.get('BENCHMARK_UPDATE_BASELINE') == '1'
+ROUNDS = int(os.environ.get('BENCHMARK_ROUNDS', '5'))
+
+# (relative, absolute) increase over the baseline allowed before a benchmark
+# fails; the absolute slack keeps millisecond-scale timings from flapping.
+# AWS call counts are deterministic, so any increase is a regression.
+THRESHOLDS = {
+    'wall_time_ms': (float(os.environ.get('BENCHMARK_TIME_THRESHOLD', '0.25')),
+                     float(os.environ.get('BENCHMARK_TIME_SLACK_MS', '5'))),
+    'peak_memory_kb': (float(os.environ.get('BENCHMARK_MEMORY_THRESHOLD', '0.10')),
+                       float(os.environ.get('BENCHMARK_MEMORY_SLACK_KB', '64'))),
+    'aws_calls': (0.0, 0),
+}
+
+class AwsCallCounter:
+    """Counts API calls made through the service's boto3 clients"""
+
+    def __init__(self, service: ImageService):
+        self.count = 0
+        self._emitters = [service.s3.meta.events, service.dynamodb.meta.client.meta.events]
+
+    def _on_call(self, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        for emitter in self._emitters:
+            emitter.register('before-call', self._on_call, unique_id='benchmark-call-counter')
+        return self
+
+    def __exit__(self, *exc_info):
+        for emitter in self._emitters:
+            emitter.unregister('before-call', unique_id='benchmark-call-counter')
+
+class BenchmarkRecorder:
+    def __init__(self):
+        self.results = {}
+        self.baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                self.baseline = json.load(f)
+
+    def measure(self, name, service, call, setup=lambda: None):
+        """Time call(setup()) over ROUNDS runs, then run it once more under tracemalloc and the call counter"""
+        times = []
+        for _ in range(ROUNDS):
+            args = setup()
+            start = time.perf_counter()
+            call(args)
+            times.append((time.perf_counter() - start) * 1000)
+
+        args = setup()
+        with AwsCallCounter(service) as counter:
+            tracemalloc.start()
+            try:
+                call(args)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        result = {
+            # The fastest round is the least disturbed by the machine's background noise
+            'wall_time_ms': round(min(times), 3),
+            'peak_memory_kb': round(peak / 1024, 1),
+            'aws_calls': counter.count,
+        }
+        self.results[name] = result
+        self.check(name, result)
+        return result
+
+    def check(self, name, result):
+        baseline = self.baseline.get(name)
+        if baseline is None or UPDATE_BASELINE:
+            return
+        regressions = [
+            f"{metric}: {result[metric]} vs baseline {baseline[metric]} (+{relative:.0%} +{absolute} allowed)"
+            for metric, (relative, absolute) in THRESHOLDS.items()
+            if metric in baseline and result[metric] > baseline[metric] * (1 + relative) + absolute
+        ]
+        assert not regressions, f"{name} regressed: " + '; '.join(regressions)
+
+    def write(self):
+        with open(RESULTS_PATH, 'w') as f:
+            json.dump(self.results, f, indent=2, sort_keys=True)
+        if UPDATE_BASELINE or not os.path.exists(BASELINE_PATH):
+            # Keep entries for benchmarks that were not part of this run
+            baseline = dict(self.baseline, **self.results)
+            with open(BASELINE_PATH, 'w') as f:
+                json.dump(baseline, f, indent=2, sort_keys=True)
+
+@pytest.fixture(scope='session')
+def benchmark_recorder():
+    recorder = BenchmarkRecorder()
+    yield recorder
+    if recorder.results:
+        recorder.write()
+
+@pytest.fixture
+def benchmark_aws(mock_aws):
+    # Start from an empty table even when the mock keeps state between tests
+    table = mock_aws.dynamodb.Table(mock_aws.table_name)
+    table.delete()
+    table.wait_until_not_exists()
+    mock_aws.setup_resources()
+    yield mock_aws
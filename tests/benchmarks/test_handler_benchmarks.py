@@ -0,0 +1,123 @@
+import pytest
+import json
+import base64
+import os
+import uuid
+from src.handlers import upload_image, list_images, view_image, delete_image
+from tests.helpers import make_png
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get('RUN_BENCHMARKS') != '1',
+    reason='set RUN_BENCHMARKS=1 to run the handler benchmarks'
+)
+
+def _sizes(variable, default):
+    return [int(size) for size in os.environ.get(variable, default).split(',')]
+
+IMAGE_SIZES = _sizes('BENCHMARK_IMAGE_SIZES', '1024,102400,1048576,5242880,20971520')
+TABLE_SIZES = _sizes('BENCHMARK_TABLE_SIZES', '100,1000,10000,100000')
+
+def make_image(size):
+    header = make_png(640, 480)
+    return header + b'\x00' * max(0, size - len(header))
+
+def seed_table(service, count, users=100):
+    """Fill the table with count metadata items spread over users"""
+    table = service.dynamodb.Table(service.table_name)
+    with table.batch_writer() as batch:
+        for i in range(count):
+            batch.put_item(Item={
+                'image_id': f'seed-{i}',
+                'user_id': f'user{i % users}',
+                'title': f'Image {i}',
+                'description': 'Seeded benchmark image',
+                'tags': ['benchmark', f'tag{i % 10}'],
+                'content_type': 'image/png',
+                'width': 640,
+                'height': 480,
+                'size_bytes': 1024,
+                'created_at': '2023-01-01T00:00:00+00:00',
+                's3_key': f'images/seed-{i}'
+            })
+
+def store_image(service, size=1024):
+    """Store an image and its metadata directly, bypassing the handlers"""
+    image_id = str(uuid.uuid4())
+    s3_key = f'images/{image_id}'
+    service.storage.put(s3_key, make_image(size), 'image/png')
+    service.put_image_metadata({
+        'image_id': image_id,
+        'user_id': 'user0',
+        'content_type': 'image/png',
+        's3_key': s3_key
+    })
+    return image_id
+
+class TestUploadBenchmark:
+    @pytest.mark.parametrize('image_size', IMAGE_SIZES)
+    def test_upload(self, benchmark_aws, benchmark_recorder, image_size):
+        event = {
+            'body': json.dumps({
+                'image': base64.b64encode(make_image(image_size)).decode(),
+                'metadata': {'user_id': 'user0', 'tags': ['benchmark']}
+            })
+        }
+
+        def call(_):
+            assert upload_image.lambda_handler(event, {})['statusCode'] == 201
+
+        benchmark_recorder.measure(f'upload_image[image={image_size}]', benchmark_aws, call)
+
+class TestListBenchmark:
+    @pytest.mark.parametrize('table_size', TABLE_SIZES)
+    def test_list_all(self, benchmark_aws, benchmark_recorder, table_size):
+        seed_table(benchmark_aws, table_size)
+
+        def call(_):
+            assert list_images.lambda_handler({}, {})['statusCode'] == 200
+
+        benchmark_recorder.measure(f'list_images[table={table_size}]', benchmark_aws, call)
+
+    @pytest.mark.parametrize('table_size', TABLE_SIZES)
+    def test_list_by_user(self, benchmark_aws, benchmark_recorder, table_size):
+        seed_table(benchmark_aws, table_size)
+        event = {'queryStringParameters': {'user_id': 'user1', 'tag': 'tag1'}}
+
+        def call(_):
+            assert list_images.lambda_handler(event, {})['statusCode'] == 200
+
+        benchmark_recorder.measure(f'list_images_by_user[table={table_size}]', benchmark_aws, call)
+
+class TestViewBenchmark:
+    @pytest.mark.parametrize('image_size', IMAGE_SIZES)
+    def test_view_by_image_size(self, benchmark_aws, benchmark_recorder, image_size):
+        event = {'pathParameters': {'image_id': store_image(benchmark_aws, image_size)}}
+
+        def call(_):
+            assert view_image.lambda_handler(event, {})['statusCode'] == 200
+
+        benchmark_recorder.measure(f'view_image[image={image_size}]', benchmark_aws, call)
+
+    @pytest.mark.parametrize('table_size', TABLE_SIZES)
+    def test_view_by_table_size(self, benchmark_aws, benchmark_recorder, table_size):
+        seed_table(benchmark_aws, table_size)
+        event = {'pathParameters': {'image_id': store_image(benchmark_aws)}}
+
+        def call(_):
+            assert view_image.lambda_handler(event, {})['statusCode'] == 200
+
+        benchmark_recorder.measure(f'view_image[table={table_size}]', benchmark_aws, call)
+
+class TestDeleteBenchmark:
+    @pytest.mark.parametrize('table_size', TABLE_SIZES)
+    def test_delete(self, benchmark_aws, benchmark_recorder, table_size):
+        seed_table(benchmark_aws, table_size)
+
+        def call(image_id):
+            event = {'pathParameters': {'image_id': image_id}}
+            assert delete_image.lambda_handler(event, {})['statusCode'] == 200
+
+        benchmark_recorder.measure(
+            f'delete_image[table={table_size}]', benchmark_aws, call,
+            setup=lambda: store_image(benchmark_aws)
+        )
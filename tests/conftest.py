@@ -0,0 +1,10 @@
+import pytest
+from moto import mock_s3, mock_dynamodb
+from src.utils.image_service import ImageService
+
+@pytest.fixture
+def mock_aws():
+    with mock_s3(), mock_dynamodb():
+        service = ImageService()
+        service.setup_resources()
+        yield service
@@ -0,0 +1,16 @@
+import struct
+
+def make_png(width, height):
+    return b'\x89PNG\r\n\x1a\n' + b'\x00\x00\x00\rIHDR' + struct.pack('>II', width, height) + b'\x08\x06\x00\x00\x00'
+
+def make_jpeg(width, height):
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+    sof0 = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+    return b'\xff\xd8' + app0 + sof0 + b'\xff\xda' + b'\x00' * 64
+
+def make_jpeg_with_icc(width, height, segments=2):
+    icc = (b'\xff\xe2' + struct.pack('>H', 0xffff) + b'\x00' * 0xfffd) * segments
+    return b'\xff\xd8' + icc + make_jpeg(width, height)[2:]
+
+def make_gif(width, height):
+    return b'GIF89a' + struct.pack('<HH', width, height) + b'\x00\x00\x00'
@@ -0,0 +1,74 @@
+import base64
+import os
+import pytest
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+import api_server
+from src.utils.image_service import ImageService
+from src.utils import metrics
+from src.utils.rate_limiter import AdmissionController
+from tests.helpers import make_png
+
+@pytest.fixture
+def client(mock_aws):
+    return TestClient(api_server.app)
+
+class TestAdmissionControl:
+    def test_caller_over_rate_is_shed(self, client, monkeypatch):
+        monkeypatch.setattr(api_server, 'admission', AdmissionController(rate=1, burst=1))
+        headers = {'X-User-Id': 'caller'}
+        assert client.get('/images', params={'user_id': 'a'}, headers=headers).status_code == 200
+        # Changing the filter does not give the caller a fresh bucket
+        response = client.get('/images', params={'user_id': 'b'}, headers=headers)
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        # Listing another user's images does not use up that user's bucket
+        assert client.get('/images', headers={'X-User-Id': 'a'}).status_code == 200
+
+    def test_throttled_handler_passes_retry_after(self, client):
+        error = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Throttled'}}, 'Scan'
+        )
+        with patch.object(ImageService, 'list_image_metadata', side_effect=error):
+            response = client.get('/images')
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+
+class TestLocalImages:
+    def test_missing_file_is_not_found(self, client, monkeypatch, tmp_path):
+        monkeypatch.setattr(api_server, 'STORAGE_BACKEND', 'local')
+        monkeypatch.setenv('STORAGE_BACKEND', 'local')
+        monkeypatch.setenv('LOCAL_STORAGE_ROOT', str(tmp_path))
+        image = base64.b64encode(make_png(2, 2)).decode()
+        image_id = client.post('/images', json={'image': image, 'metadata': {'user_id': 'u'}}).json()['image_id']
+
+        response = client.get(f'/images/{image_id}')
+        assert response.status_code == 200
+        assert response.headers['Content-Disposition'] == f'inline; filename="{image_id}"'
+
+        os.unlink(ImageService().storage.local_path(f'images/{image_id}'))
+        response = client.get(f'/images/{image_id}')
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Image not found'}
+
+class TestObservability:
+    def test_request_id_and_metrics(self, client):
+        metrics.reset()
+        image = base64.b64encode(make_png(2, 2)).decode()
+        response = client.post('/images', json={'image': image, 'metadata': {'user_id': 'u'}},
+                               headers={'X-Request-Id': 'req-upload'})
+        assert response.headers['X-Request-Id'] == 'req-upload'
+        image_id = response.json()['image_id']
+        response = client.get(f'/images/{image_id}')
+        assert response.status_code == 200
+        assert response.headers['X-Request-Id']
+        client.get('/nowhere')
+
+        text = client.get('/metrics').text
+        assert 'http_requests_total{method="POST",route="upload_image_endpoint",status="200"} 1' in text
+        assert 'http_requests_total{method="GET",route="view_image_endpoint",status="200"} 1' in text
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+        assert 'span_duration_seconds_count{span="handler.upload_image"} 1' in text
+        assert 'aws_call_duration_seconds_count{operation="PutObject",service="s3"} 1' in text
+        assert 'aws_call_duration_seconds_count{operation="GetItem",service="dynamodb"} 1' in text
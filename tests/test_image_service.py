@@ -1,29 +1,25 @@
 import pytest
 import json
 import base64
-from moto import mock_s3, mock_dynamodb
 from unittest.mock import patch, MagicMock
+from botocore.exceptions import ClientError
 from src.handlers import upload_image, list_images, view_image, delete_image
 from src.utils.image_service import ImageService
-
-@pytest.fixture
-def mock_aws():
-    with mock_s3(), mock_dynamodb():
-        service = ImageService()
-        service.setup_resources()
-        yield service
+from src.utils import metrics
+from tests.helpers import make_png, make_jpeg_with_icc
 
 class TestUploadImage:
     def test_upload_success(self, mock_aws):
+        image_data = make_png(640, 480)
         event = {
             'body': json.dumps({
-                'image': base64.b64encode(b'fake_image_data').decode(),
+                'image': base64.b64encode(image_data).decode(),
                 'metadata': {
                     'user_id': 'user123',
                     'title': 'Test Image',
                     'description': 'Test Description',
                     'tags': ['test', 'demo'],
-                    'content_type': 'image/jpeg'
+                    'content_type': 'image/png'
                 }
             })
         }
@@ -33,6 +29,52 @@ class TestUploadImage:
         body = json.loads(response['body'])
         assert 'image_id' in body
         assert body['message'] == 'Image uploaded successfully'
+        
+        table = mock_aws.dynamodb.Table(mock_aws.table_name)
+        item = table.get_item(Key={'image_id': body['image_id']})['Item']
+        assert (item['width'], item['height']) == (640, 480)
+        assert item['size_bytes'] == len(image_data)
+
+    def test_upload_content_type_mismatch(self, mock_aws):
+        event = {
+            'body': json.dumps({
+                'image': base64.b64encode(make_png(640, 480)).decode(),
+                'metadata': {'user_id': 'user123', 'content_type': 'image/jpeg'}
+            })
+        }
+        response = upload_image.lambda_handler(event, {})
+        assert response['statusCode'] == 400
+
+    def test_upload_jpeg_with_large_icc_segments(self, mock_aws):
+        event = {
+            'body': json.dumps({
+                'image': base64.b64encode(make_jpeg_with_icc(1920, 1080)).decode(),
+                'metadata': {'user_id': 'user123', 'content_type': 'image/jpeg'}
+            })
+        }
+        response = upload_image.lambda_handler(event, {})
+        assert response['statusCode'] == 201
+        image_id = json.loads(response['body'])['image_id']
+        item = mock_aws.get_image_metadata(image_id)
+        assert (item['width'], item['height']) == (1920, 1080)
+
+    def test_upload_rejected_before_full_decode(self, mock_aws):
+        encoded = base64.b64encode(b'fake_image_data' * 100000).decode()
+        event = {'body': json.dumps({'image': encoded, 'metadata': {'user_id': 'user123'}})}
+        with patch.object(upload_image.base64, 'b64decode', wraps=base64.b64decode) as decode:
+            response = upload_image.lambda_handler(event, {})
+        assert response['statusCode'] == 400
+        assert all(len(call.args[0]) < len(encoded) for call in decode.call_args_list)
+
+    def test_upload_unsupported_format(self, mock_aws):
+        event = {
+            'body': json.dumps({
+                'image': base64.b64encode(b'fake_image_data').decode(),
+                'metadata': {'user_id': 'user123'}
+            })
+        }
+        response = upload_image.lambda_handler(event, {})
+        assert response['statusCode'] == 400
 
     def test_upload_invalid_data(self, mock_aws):
         event = {'body': 'invalid_json'}
@@ -72,6 +114,15 @@ class TestListImages:
         response = list_images.lambda_handler(event, {})
         assert response['statusCode'] == 200
 
+    def test_list_throttled(self, mock_aws):
+        error = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Throttled'}}, 'Scan'
+        )
+        with patch.object(ImageService, 'list_image_metadata', side_effect=error):
+            response = list_images.lambda_handler({}, {})
+        assert response['statusCode'] == 429
+        assert response['headers']['Retry-After'] == '1'
+
 class TestViewImage:
     def test_view_existing_image(self, mock_aws):
         # Setup test data
@@ -99,6 +150,18 @@ class TestViewImage:
         response = view_image.lambda_handler(event, {})
         assert response['statusCode'] == 404
 
+    def test_view_image_missing_from_storage(self, mock_aws):
+        table = mock_aws.dynamodb.Table(mock_aws.table_name)
+        table.put_item(Item={
+            'image_id': 'orphan',
+            'user_id': 'user1',
+            's3_key': 'images/orphan',
+            'content_type': 'image/png'
+        })
+        response = view_image.lambda_handler({'pathParameters': {'image_id': 'orphan'}}, {})
+        assert response['statusCode'] == 404
+        assert json.loads(response['body']) == {'error': 'Image not found'}
+
 class TestDeleteImage:
     def test_delete_existing_image(self, mock_aws):
         # Setup test data
@@ -122,4 +185,50 @@ class TestDeleteImage:
     def test_delete_nonexistent_image(self, mock_aws):
         event = {'pathParameters': {'image_id': 'nonexistent'}}
         response = delete_image.lambda_handler(event, {})
-        assert response['statusCode'] == 404
\ No newline at end of file
+        assert response['statusCode'] == 404
+
+class TestLocalStorageBackend:
+    def test_upload_view_delete(self, mock_aws, monkeypatch, tmp_path):
+        monkeypatch.setenv('STORAGE_BACKEND', 'local')
+        monkeypatch.setenv('LOCAL_STORAGE_ROOT', str(tmp_path))
+        image_data = make_png(1, 1)
+        event = {
+            'body': json.dumps({
+                'image': base64.b64encode(image_data).decode(),
+                'metadata': {'user_id': 'user1'}
+            })
+        }
+        image_id = json.loads(upload_image.lambda_handler(event, {})['body'])['image_id']
+        
+        response = view_image.lambda_handler({'pathParameters': {'image_id': image_id}}, {})
+        assert response['statusCode'] == 200
+        assert base64.b64decode(response['body']) == image_data
+        
+        response = delete_image.lambda_handler({'pathParameters': {'image_id': image_id}}, {})
+        assert response['statusCode'] == 200
+        assert ImageService().storage.local_path(f'images/{image_id}') is None
+
+class TestConsumedCapacity:
+    def test_table_and_index_capacity(self, mock_aws):
+        metrics.reset()
+        mock_aws._record_consumed_capacity([{
+            'TableName': 'image-metadata',
+            'CapacityUnits': 1.5,
+            'GlobalSecondaryIndexes': {'user-index': {'CapacityUnits': 0.5}},
+        }])
+        mock_aws._record_consumed_capacity({'CapacityUnits': 1.0})
+        assert metrics.get_counter('dynamodb_consumed_capacity_units_total', table='image-metadata') == 2.5
+        assert metrics.get_counter('dynamodb_consumed_capacity_units_total',
+                                   table='image-metadata', index='user-index') == 0.5
+
+    def test_throttled_requests_counted(self, mock_aws):
+        metrics.reset()
+        error = ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Throttled'}}, 'GetItem'
+        )
+        with patch.object(mock_aws, 'dynamodb') as dynamodb:
+            dynamodb.Table.return_value.get_item.side_effect = error
+            with pytest.raises(ClientError):
+                mock_aws.get_image_metadata('img1')
+        assert metrics.get_counter('dynamodb_throttled_requests_total',
+                                   table='image-metadata', operation='get_item') == 1
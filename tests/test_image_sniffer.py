@@ -0,0 +1,56 @@
+import base64
+import struct
+from src.utils.image_sniffer import sniff_image, normalize_content_type, base64_header, SNIFF_BYTES
+from tests.helpers import make_png, make_jpeg, make_jpeg_with_icc, make_gif
+
+class TestSniffImage:
+    def test_png(self):
+        assert sniff_image(make_png(640, 480)) == ('image/png', 640, 480)
+
+    def test_jpeg_skips_app_segments(self):
+        assert sniff_image(make_jpeg(1920, 1080)) == ('image/jpeg', 1920, 1080)
+
+    def test_gif(self):
+        assert sniff_image(make_gif(32, 16)) == ('image/gif', 32, 16)
+
+    def test_webp_lossy(self):
+        vp8 = b'VP8 ' + b'\x00' * 4 + b'\x00\x00\x00' + b'\x9d\x01\x2a' + struct.pack('<HH', 300, 200)
+        data = b'RIFF' + b'\x00' * 4 + b'WEBP' + vp8
+        assert sniff_image(data) == ('image/webp', 300, 200)
+
+    def test_webp_extended(self):
+        vp8x = b'VP8X' + b'\x00' * 8 + (99).to_bytes(3, 'little') + (49).to_bytes(3, 'little')
+        data = b'RIFF' + b'\x00' * 4 + b'WEBP' + vp8x
+        assert sniff_image(data) == ('image/webp', 100, 50)
+
+    def test_unknown_format(self):
+        assert sniff_image(b'fake_image_data') is None
+
+    def test_truncated_header(self):
+        assert sniff_image(make_png(640, 480)[:12]) == ('image/png', None, None)
+
+    def test_jpeg_without_frame_header(self):
+        for filler in (b'\xff\xe0\x00\x02', b'\xff\x01'):
+            assert sniff_image(b'\xff\xd8' + filler * 1000) == ('image/jpeg', None, None)
+
+    def test_jpeg_frame_header_after_large_segments(self):
+        # Two maximum-size APP2 (ICC profile) segments, as camera and editor output often has
+        data = make_jpeg_with_icc(1920, 1080)
+        assert sniff_image(data) == ('image/jpeg', 1920, 1080)
+        assert sniff_image(data[:SNIFF_BYTES]) == ('image/jpeg', None, None)
+
+    def test_normalize_content_type(self):
+        assert normalize_content_type('Image/JPG; charset=binary') == 'image/jpeg'
+
+class TestBase64Header:
+    def test_decodes_prefix_only(self):
+        data = make_png(640, 480) + b'\x00' * (SNIFF_BYTES * 2)
+        header = base64_header(base64.b64encode(data).decode())
+        assert len(header) >= SNIFF_BYTES
+        assert len(header) < len(data)
+        assert sniff_image(header) == ('image/png', 640, 480)
+
+    def test_line_wrapped_input(self):
+        data = make_png(640, 480) + b'\x00' * (SNIFF_BYTES * 2)
+        encoded = base64.encodebytes(data).decode()
+        assert sniff_image(base64_header(encoded)) == ('image/png', 640, 480)
@@ -0,0 +1,93 @@
+import math
+import multiprocessing
+import queue
+import random
+import pytest
+from infrastructure import load_generator
+from infrastructure.load_generator import LatencyHistogram, endpoint_label, parse_mix, run_load
+
+class TestLatencyHistogram:
+    def test_percentile_error_bound(self):
+        rng = random.Random(1)
+        values = sorted(rng.randint(1, 10_000_000) for _ in range(5000))
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value / 1_000_000)
+        bound = 1 / 2 ** (LatencyHistogram.SUB_BUCKET_BITS - 1)
+        for percent in (50, 90, 99, 99.9):
+            exact = values[math.ceil(len(values) * percent / 100) - 1] / 1000
+            assert abs(histogram.percentile(percent) - exact) <= exact * bound
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram()
+        for value in (0, 1, 2, 127):
+            histogram.record(value / 1_000_000)
+        assert histogram.percentile(50) == 0.001
+        assert histogram.percentile(100) == 0.127
+
+    def test_merge_and_round_trip(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for value in (0.001, 0.002, 0.003):
+            first.record(value)
+        second.record(0.5)
+        first.merge(second)
+        restored = LatencyHistogram.from_dict(first.to_dict())
+        assert restored.total == 4
+        assert restored.summary() == first.summary()
+        assert restored.summary()['max'] == 500.0
+
+    def test_empty(self):
+        assert LatencyHistogram().summary()['p99'] == 0.0
+
+class TestHelpers:
+    def test_parse_mix(self):
+        assert parse_mix('upload=1, view=10,list') == [('upload', 1.0), ('view', 10.0), ('list', 1.0)]
+
+    def test_parse_mix_rejects_unknown_operation(self):
+        with pytest.raises(ValueError):
+            parse_mix('upload=1,update=2')
+
+    def test_endpoint_label(self):
+        assert endpoint_label('GET', '/images/abc') == 'GET /images/{image_id}'
+        assert endpoint_label('GET', '/images') == 'GET /images'
+
+    def test_shed_is_not_an_error(self):
+        assert load_generator._is_shed('429') and not load_generator._is_error('429')
+        assert load_generator._is_error('500') and load_generator._is_error('exception')
+        assert load_generator._is_error('404') and not load_generator._is_error('201')
+
+class FakeWorker:
+    def __init__(self, name, exitcode):
+        self.name = name
+        self.exitcode = exitcode
+        self.terminated = False
+
+    def is_alive(self):
+        return self.exitcode is None and not self.terminated
+
+    def terminate(self):
+        self.terminated = True
+
+class TestCollectResults:
+    def test_dead_worker_is_named(self, monkeypatch):
+        monkeypatch.setattr(load_generator, 'WORKER_POLL_SECONDS', 0.01)
+        results = queue.Queue()
+        results.put({'worker': 0})
+        workers = [FakeWorker('loadgen-worker-0', 0), FakeWorker('loadgen-worker-1', 1),
+                   FakeWorker('loadgen-worker-2', None)]
+        with pytest.raises(RuntimeError, match='loadgen-worker-1 exited with code 1'):
+            load_generator._collect_results(workers, results)
+        assert workers[2].terminated
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+class TestRunLoad:
+    def test_handler_target_smoke(self, mock_aws):
+        config = {
+            'target': 'handler', 'url': '', 'mix': load_generator.DEFAULT_MIX, 'trace': None,
+            'processes': 2, 'rate': 0.0, 'duration': 1.0, 'users': 5, 'seed': 0,
+        }
+        report = run_load(config, start_method='fork')
+        assert report['requests'] > 0
+        assert report['errors'] == 0 and report['shed'] == 0
+        assert 'POST /images' in report['endpoints']
+        assert report['latency_ms']['p50'] <= report['latency_ms']['max']
@@ -0,0 +1,32 @@
+from unittest.mock import patch
+from src.utils.rate_limiter import TokenBucket, AdmissionController
+
+class TestTokenBucket:
+    def test_burst_then_wait(self):
+        with patch('src.utils.rate_limiter.time.monotonic', return_value=100.0):
+            bucket = TokenBucket(rate=2, capacity=3)
+            assert [bucket.consume() for _ in range(3)] == [0.0, 0.0, 0.0]
+            assert bucket.consume() == 0.5
+
+    def test_refill(self):
+        with patch('src.utils.rate_limiter.time.monotonic', side_effect=[100.0, 100.0, 101.0]):
+            bucket = TokenBucket(rate=1, capacity=1)
+            assert bucket.consume() == 0.0
+            assert bucket.consume() == 0.0
+
+class TestAdmissionController:
+    def test_keys_are_independent(self):
+        controller = AdmissionController(rate=1, burst=1)
+        assert controller.admit('user:a') == 0.0
+        assert controller.admit('user:a') > 0
+        assert controller.admit('user:b') == 0.0
+
+    def test_disabled(self):
+        controller = AdmissionController(rate=0, burst=0)
+        assert all(controller.admit('user:a') == 0.0 for _ in range(100))
+
+    def test_evicts_least_recently_used(self):
+        controller = AdmissionController(rate=1, burst=1, max_keys=2)
+        for key in ('a', 'b', 'c'):
+            controller.admit(key)
+        assert list(controller._buckets) == ['b', 'c']
@@ -0,0 +1,76 @@
+import json
+from unittest.mock import patch
+from src.handlers import router
+from src.utils import metrics, tracing
+
+class TestRouteMatching:
+    def test_rest_api_resource(self):
+        event = {'httpMethod': 'GET', 'resource': '/images/{image_id}', 'pathParameters': {'image_id': 'img1'}}
+        assert router._match_route(event) == ('view_image', {'image_id': 'img1'})
+
+    def test_path_only(self):
+        assert router._match_route({'httpMethod': 'DELETE', 'path': '/images/img1/'}) == (
+            'delete_image', {'image_id': 'img1'}
+        )
+        assert router._match_route({'httpMethod': 'POST', 'path': '/images'}) == ('upload_image', {})
+
+    def test_http_api_event(self):
+        event = {'requestContext': {'http': {'method': 'GET'}}, 'rawPath': '/images'}
+        assert router._match_route(event) == ('list_images', {})
+
+    def test_http_api_route_key_with_stage(self):
+        event = {
+            'routeKey': 'GET /images/{image_id}',
+            'rawPath': '/prod/images/img1',
+            'pathParameters': {'image_id': 'img1'},
+            'requestContext': {'http': {'method': 'GET'}, 'stage': 'prod'},
+        }
+        assert router._match_route(event) == ('view_image', {'image_id': 'img1'})
+
+    def test_http_api_catch_all_route_with_stage(self):
+        event = {
+            'routeKey': 'ANY /{proxy+}',
+            'rawPath': '/prod/images/img1',
+            'requestContext': {'http': {'method': 'DELETE'}, 'stage': 'prod'},
+        }
+        assert router._match_route(event) == ('delete_image', {'image_id': 'img1'})
+
+    def test_unknown_route(self):
+        assert router._match_route({'httpMethod': 'PUT', 'path': '/images'})[0] is None
+        assert router._match_route({'httpMethod': 'GET', 'path': '/health'})[0] is None
+
+class TestRouterHandler:
+    def test_not_found(self):
+        response = router.lambda_handler({'httpMethod': 'GET', 'path': '/unknown'}, {})
+        assert response['statusCode'] == 404
+
+    def test_unmatched_request_is_traced(self):
+        metrics.reset()
+        response = router.lambda_handler({'httpMethod': 'GET', 'path': '/unknown', 'headers': {'X-Request-Id': 'r1'}}, {})
+        assert response['headers']['X-Request-Id'] == 'r1'
+        assert metrics.get_histogram_count('request_duration_seconds', route='router') == 1
+        assert 'requests_total{route="router",status="404"} 1' in metrics.render_prometheus()
+
+    def test_dispatch_fills_path_parameters(self):
+        with patch.object(router, '_get_handler') as get_handler:
+            get_handler.return_value.return_value = {'statusCode': 200}
+            router.lambda_handler({'httpMethod': 'GET', 'path': '/images/img1'}, {})
+        get_handler.assert_called_once_with('view_image')
+        event = get_handler.return_value.call_args[0][0]
+        assert event['pathParameters'] == {'image_id': 'img1'}
+
+    def test_routed_request_is_labelled_with_its_route(self, mock_aws, monkeypatch, capsys):
+        monkeypatch.setattr(tracing, 'EMF_ENABLED', True)
+        metrics.reset()
+        router.lambda_handler({'httpMethod': 'GET', 'path': '/images/missing'}, {})
+        assert metrics.get_histogram_count('request_duration_seconds', route='view_image') == 1
+        assert metrics.get_histogram_count('request_duration_seconds', route='router') == 0
+        assert metrics.get_counter('requests_total', route='view_image', status='404') == 1
+        assert metrics.get_histogram_count('span_duration_seconds', span='handler.view_image') == 1
+        record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        assert record['Route'] == 'view_image'
+
+    def test_dispatch_to_list_images(self, mock_aws):
+        response = router.lambda_handler({'httpMethod': 'GET', 'path': '/images'}, {})
+        assert response['statusCode'] == 200
+        assert 'images' in json.loads(response['body'])
@@ -0,0 +1,57 @@
+import pytest
+import importlib
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from src.utils import serializer
+from src.utils.response import create_response
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend_serializer(request, monkeypatch):
+    monkeypatch.setenv('JSON_BACKEND', request.param)
+    yield importlib.reload(serializer)
+    monkeypatch.undo()
+    importlib.reload(serializer)
+
+class TestSerializerBackends:
+    def test_large_integral_decimals(self, backend_serializer):
+        body = json.loads(backend_serializer.dumps({
+            'big': Decimal('123456789012345678901234567890'),
+            'negative': Decimal(-2 ** 63),
+            'unsigned': Decimal(2 ** 64 - 1),
+        }))
+        assert body == {'big': '123456789012345678901234567890', 'negative': -2 ** 63, 'unsigned': 2 ** 64 - 1}
+
+    def test_binary_values_are_base64(self, backend_serializer):
+        from boto3.dynamodb.types import Binary
+        body = json.loads(backend_serializer.dumps({'raw': b'\xff\xd8\xff', 'attr': Binary(b'\x00\x01')}))
+        assert body == {'raw': '/9j/', 'attr': 'AAE='}
+
+    def test_unsupported_type(self, backend_serializer):
+        with pytest.raises(TypeError):
+            backend_serializer.dumps({'value': object()})
+
+class TestSerializer:
+    def test_decimal_values(self):
+        body = json.loads(serializer.dumps({'width': Decimal(1920), 'ratio': Decimal('1.5')}))
+        assert body == {'width': 1920, 'ratio': 1.5}
+        assert isinstance(body['width'], int)
+
+    def test_sets_and_datetimes(self):
+        created_at = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        body = json.loads(serializer.dumps({'tags': {'nature'}, 'created_at': created_at}))
+        assert body['tags'] == ['nature']
+        assert body['created_at'].startswith('2023-01-01T00:00:00')
+
+    def test_unsupported_type(self):
+        with pytest.raises(TypeError):
+            serializer.dumps({'value': object()})
+
+    def test_round_trip(self):
+        page = {'images': [{'image_id': 'img1', 'tags': ['a', 'b']}], 'count': 1}
+        assert serializer.loads(serializer.dumps(page)) == page
+        assert serializer.loads(serializer.dumps_bytes(page)) == page
+
+    def test_create_response_with_dynamodb_item(self):
+        response = create_response(200, {'images': [{'size_bytes': Decimal(10)}], 'count': 1})
+        assert json.loads(response['body'])['images'][0]['size_bytes'] == 10
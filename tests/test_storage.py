@@ -0,0 +1,76 @@
+import os
+import boto3
+import pytest
+from moto import mock_s3
+from src.utils.storage import S3Storage, LocalStorage, ObjectNotFoundError
+
+@pytest.fixture(params=['s3', 'local'])
+def storage(request, tmp_path):
+    if request.param == 's3':
+        with mock_s3():
+            backend = S3Storage(boto3.client('s3', region_name='us-east-1'), 'instagram-images')
+            backend.setup()
+            yield backend
+    else:
+        backend = LocalStorage(str(tmp_path / 'images'))
+        backend.setup()
+        yield backend
+
+class TestStorageParity:
+    def test_put_and_get(self, storage):
+        storage.put('images/img1', b'fake_image_data', 'image/png')
+        assert storage.get('images/img1') == b'fake_image_data'
+
+    def test_put_overwrites(self, storage):
+        storage.put('images/img1', b'old', 'image/png')
+        storage.put('images/img1', b'new', 'image/png')
+        assert storage.get('images/img1') == b'new'
+
+    def test_get_stream(self, storage):
+        storage.put('images/img1', b'fake_image_data', 'image/png')
+        stream = storage.get_stream('images/img1')
+        try:
+            assert stream.read(4) == b'fake'
+        finally:
+            stream.close()
+
+    def test_get_range(self, storage):
+        storage.put('images/img1', b'0123456789', 'image/png')
+        assert storage.get_range('images/img1', 2, 5) == b'2345'
+
+    def test_get_missing(self, storage):
+        with pytest.raises(ObjectNotFoundError):
+            storage.get('images/missing')
+
+    def test_delete(self, storage):
+        storage.put('images/img1', b'fake_image_data', 'image/png')
+        storage.delete('images/img1')
+        storage.delete('images/img1')
+        with pytest.raises(ObjectNotFoundError):
+            storage.get('images/img1')
+
+    def test_delete_many(self, storage):
+        keys = [f'images/img{i}' for i in range(5)]
+        for key in keys:
+            storage.put(key, b'x', 'image/png')
+        storage.delete_many(keys[:3])
+        for key in keys[:3]:
+            with pytest.raises(ObjectNotFoundError):
+                storage.get(key)
+        assert storage.get(keys[4]) == b'x'
+
+    def test_presign(self, storage):
+        storage.put('images/img1', b'fake_image_data', 'image/png')
+        assert 'img1' in storage.presign('images/img1')
+
+class TestLocalStorage:
+    def test_sharded_atomic_layout(self, tmp_path):
+        storage = LocalStorage(str(tmp_path))
+        storage.put('images/img1', b'fake_image_data', 'image/png')
+        path = storage.local_path('images/img1')
+        assert os.path.relpath(path, str(tmp_path)).count(os.sep) == 2
+        assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+
+    def test_rejects_traversal(self, tmp_path):
+        with pytest.raises(ValueError):
+            LocalStorage(str(tmp_path)).put('..', b'x', 'image/png')
@@ -0,0 +1,102 @@
+import json
+import logging
+import pytest
+from botocore.exceptions import ClientError
+from src.utils import metrics, tracing, logger as logger_module
+from src.utils.tracing import span, traced_handler, request_context, current_request_id
+
+@traced_handler('echo')
+def echo_handler(event, context):
+    with span('work'):
+        request_id = current_request_id()
+    return {'statusCode': 200, 'headers': {}, 'body': request_id}
+
+class TestMetrics:
+    def setup_method(self):
+        metrics.reset()
+
+    def test_prometheus_rendering(self):
+        metrics.increment('requests_total', route='list_images', status='200')
+        metrics.observe('span_duration_seconds', 0.003, span='serialize')
+        metrics.observe('span_duration_seconds', 20.0, span='serialize')
+        text = metrics.render_prometheus()
+        assert '# TYPE requests_total counter' in text
+        assert 'requests_total{route="list_images",status="200"} 1' in text
+        assert 'span_duration_seconds_bucket{span="serialize",le="0.0025"} 0' in text
+        assert 'span_duration_seconds_bucket{span="serialize",le="0.005"} 1' in text
+        assert 'span_duration_seconds_bucket{span="serialize",le="+Inf"} 2' in text
+        assert 'span_duration_seconds_count{span="serialize"} 2' in text
+
+class TestTracedHandler:
+    def setup_method(self):
+        metrics.reset()
+
+    def test_request_id_from_header(self):
+        response = echo_handler({'headers': {'X-Request-Id': 'req-1'}}, None)
+        assert response['body'] == 'req-1'
+        assert response['headers']['X-Request-Id'] == 'req-1'
+        assert metrics.get_histogram_count('request_duration_seconds', route='echo') == 1
+        assert metrics.get_histogram_count('span_duration_seconds', span='work') == 1
+
+    def test_request_id_from_lambda_context(self):
+        class Context:
+            aws_request_id = 'lambda-req'
+        assert echo_handler({}, Context())['body'] == 'lambda-req'
+
+    def test_nested_handler_joins_current_request(self):
+        with request_context('outer', 'router'):
+            response = echo_handler({'headers': {'X-Request-Id': 'inner'}}, None)
+        assert response['body'] == 'outer'
+        assert metrics.get_histogram_count('span_duration_seconds', span='handler.echo') == 1
+        assert metrics.get_histogram_count('request_duration_seconds', route='echo') == 0
+
+    def test_emf_line(self, monkeypatch, capsys):
+        monkeypatch.setattr(tracing, 'EMF_ENABLED', True)
+        echo_handler({'requestContext': {'requestId': 'apigw-req'}}, None)
+        record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        assert record['RequestId'] == 'apigw-req'
+        assert record['Route'] == 'echo'
+        names = [m['Name'] for m in record['_aws']['CloudWatchMetrics'][0]['Metrics']]
+        assert 'work.ms' in names and 'Duration.ms' in names
+
+class TestAwsCallInstrumentation:
+    def setup_method(self):
+        metrics.reset()
+
+    def test_dynamodb_call_is_timed(self, mock_aws):
+        mock_aws.get_image_metadata('missing')
+        assert metrics.get_histogram_count('aws_call_duration_seconds', service='dynamodb', operation='GetItem') == 1
+
+    def test_s3_error_is_counted(self, mock_aws):
+        with pytest.raises(ClientError):
+            mock_aws.s3.get_object(Bucket=mock_aws.bucket_name, Key='images/missing')
+        assert metrics.get_histogram_count('aws_call_duration_seconds', service='s3', operation='GetObject') == 1
+        assert metrics.get_counter('aws_call_errors_total', service='s3', operation='GetObject', code='NoSuchKey') == 1
+
+    def test_calls_are_spans_of_the_current_request(self, mock_aws):
+        with request_context('req-1', 'test') as trace:
+            mock_aws.get_image_metadata('missing')
+        assert [name for name, _ in trace.spans] == ['dynamodb.GetItem']
+
+class TestLogSampling:
+    def make_record(self, level):
+        return logging.LogRecord('test', level, __file__, 1, 'message %s', ('arg',), None)
+
+    def test_sampled_per_request(self, monkeypatch):
+        monkeypatch.setattr(logger_module, 'LOG_SAMPLE_RATE', 0.5)
+        log_filter = logger_module.RequestContextFilter()
+        kept = 0
+        for i in range(200):
+            with request_context(f'req-{i}', 'test'):
+                first = log_filter.filter(self.make_record(logging.INFO))
+                assert log_filter.filter(self.make_record(logging.INFO)) == first
+                assert log_filter.filter(self.make_record(logging.ERROR))
+                kept += first
+        assert 50 < kept < 150
+
+    def test_request_id_attached(self):
+        log_filter = logger_module.RequestContextFilter()
+        record = self.make_record(logging.INFO)
+        with request_context('req-9', 'test'):
+            log_filter.filter(record)
+        assert record.request_id == 'req-9'